@@ -12,9 +12,12 @@ Main fixes:
 from __future__ import annotations
 
 import json
+import os
 import re
 import sys
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -27,9 +30,30 @@ VLOGS_UID = "victorialogs"
 VLOGS_NAME = "VictoriaLogs"
 VLOGS_TYPE = "victoriametrics-logs-datasource"
 
+# Shared normalized datasource values. Never mutated: the walker does not descend into them and
+# serialization writes values, so every reference is emitted as its own object.
+_PROM_DS = {"type": "prometheus", "uid": PROM_UID}
+_VLOGS_DS = {"type": VLOGS_TYPE, "uid": VLOGS_UID}
+
 KEEP_INPUTS = False
 
+# import-time placeholder that must not survive normalization (as serialized by dump_json)
+_BAD_PROM_UID = b'"uid": "${DS_PROMETHEUS}"'
+
 _UID_ALLOWED = re.compile(r"^[a-zA-Z0-9_-]{1,40}$")
+_SLUG_BAD = re.compile(r"[^a-z0-9_-]+")
+# ASCII fast path for _SLUG_BAD: map every disallowed ASCII char to "-"
+_SLUG_KEEP = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_-")
+_SLUG_TRANS = str.maketrans({chr(c): "-" for c in range(128) if chr(c) not in _SLUG_KEEP})
+_SLUG_MULTI = re.compile(r"-{2,}")
+# already a slug: nothing for the two substitutions above to change
+_SLUG_CLEAN = re.compile(r"[a-z0-9_]+(?:-[a-z0-9_]+)*")
+
+# string values that may embed a dashboard uid inside a URL (e.g. "/d/<uid>/<slug>?var-x=...")
+_LINK_KEYS = frozenset(("url", "dashUri", "link"))
+
+# docker-engine-health-21040 selector: {instance=~"rpi-hub"} / {instance=~'rpi-hub.*'} (either quote)
+_RPI_HUB_SELECTOR = re.compile(r"""\{instance=~(['"])rpi-hub(?:\.\*)?\1\}""")
 
 # --- VictoriaLogs Explorer (gnet 22759) environment normalization ---
 # The upstream dashboard is Kubernetes-oriented; in this homelab we ingest docker/journald logs.
@@ -44,8 +68,30 @@ _BAD_OPTIONAL_QUERY_PATTERNS = (
     ' AND ($query != "" or 1==1)',
     " AND ($query != '' or 1==1)",
     ' AND ($query != \\"\\\\" or 1==1)',
+    # common variant without leading space
+    'AND ($query != "" or 1==1)',
 )
 
+# All explorer rewrites in one pass; alternation order keeps the leading-space variants ahead of
+# the bare one, so matches are the same as applying the replacements one after another.
+_VLOGS_EXPLORER_REPLACEMENTS = {
+    **_K8S_TO_HOMELAB_FIELD_MAP,
+    **dict.fromkeys(_BAD_OPTIONAL_QUERY_PATTERNS, ""),
+}
+_VLOGS_EXPLORER_RE = re.compile("|".join(map(re.escape, _VLOGS_EXPLORER_REPLACEMENTS)))
+
+
+def loads_json(raw: bytes) -> Any:
+    # stdlib only: orjson would turn >64-bit ints into floats and reject NaN
+    return json.loads(raw)
+
+
+def dump_json(data: Any) -> bytes:
+    # stdlib is the canonical writer, same format as always (2-space indent, \uXXXX escapes,
+    # trailing newline): orjson spells floats differently (0.00001 vs 1e-05), so output would
+    # depend on what is installed.
+    return (json.dumps(data, indent=2) + "\n").encode("utf-8")
+
 
 def dash_root() -> Path:
     p = Path("stacks/monitoring/grafana/dashboards")
@@ -54,22 +100,37 @@ def dash_root() -> Path:
     return Path("monitoring/grafana/dashboards")
 
 
+@lru_cache(maxsize=4096)
 def slugify_uid(s: str, limit: int = 40) -> str:
     s = (s or "").strip().lower().replace(".", "-")
-    s = re.sub(r"[^a-z0-9_-]+", "-", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
+    if not _SLUG_CLEAN.fullmatch(s):
+        s = s.translate(_SLUG_TRANS) if s.isascii() else _SLUG_BAD.sub("-", s)
+        s = _SLUG_MULTI.sub("-", s).strip("-")
     return s[:limit] or "dashboard"
 
 
+@lru_cache(maxsize=4096)
 def ensure_uid(uid: str) -> str:
     uid = (uid or "").strip()
     return uid if _UID_ALLOWED.match(uid) else slugify_uid(uid)
 
 
 def iter_json_files(root: Path) -> Iterable[Path]:
-    for p in root.rglob("*.json"):
-        if p.is_file() and p.name != "manifest.json" and not p.name.startswith("."):
-            yield p
+    # os.scandir: DirEntry type checks come from readdir, no Path object or stat per entry.
+    # Symlinked dirs are not descended into (like Path.rglob), so link loops can't recurse.
+    dirs = [str(root)]
+    while dirs:
+        with os.scandir(dirs.pop()) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    dirs.append(e.path)
+                elif (
+                    e.name.endswith(".json")
+                    and e.name != "manifest.json"
+                    and not e.name.startswith(".")
+                    and e.is_file()
+                ):
+                    yield Path(e.path)
 
 
 def normalize_datasource_value(ds_val: Any) -> Any:
@@ -78,10 +139,16 @@ def normalize_datasource_value(ds_val: Any) -> Any:
             return ds_val
 
         ds_type, ds_uid = ds_val.get("type"), ds_val.get("uid")
+        # already normalized (the common case on re-runs): keep the dict, don't allocate a new one
+        if len(ds_val) == 2 and (
+            (ds_type == "prometheus" and ds_uid == PROM_UID)
+            or (ds_type == VLOGS_TYPE and ds_uid == VLOGS_UID)
+        ):
+            return ds_val
 
         # Prometheus normalization
         if ds_type == "prometheus" or ds_uid in (PROM_UID, "${DS_PROMETHEUS}", f"${{{PROM_UID}}}"):
-            return {"type": "prometheus", "uid": PROM_UID}
+            return _PROM_DS
 
         # VictoriaLogs normalization
         if ds_type == VLOGS_TYPE or ds_uid in (
@@ -90,7 +157,7 @@ def normalize_datasource_value(ds_val: Any) -> Any:
             "${victorialogs}",
             f"${{{VLOGS_UID}}}",
         ):
-            return {"type": VLOGS_TYPE, "uid": VLOGS_UID}
+            return _VLOGS_DS
 
         return ds_val
 
@@ -98,98 +165,210 @@ def normalize_datasource_value(ds_val: Any) -> Any:
     if isinstance(ds_val, str):
         v = ds_val.strip()
         if v in (PROM_NAME, PROM_UID, "${DS_PROMETHEUS}"):
-            return {"type": "prometheus", "uid": PROM_UID}
+            return _PROM_DS
         if v in (VLOGS_NAME, VLOGS_UID, "${DS_VICTORIALOGS}"):
-            return {"type": VLOGS_TYPE, "uid": VLOGS_UID}
+            return _VLOGS_DS
 
     return ds_val
 
 
+def is_docker_engine_health(rel_path: str) -> bool:
+    return rel_path.endswith("docker/docker-engine-health-21040.json")
+
+
 def patch_promql_expr(expr: Any, rel_path: str) -> Any:
     if not isinstance(expr, str):
         return expr
 
     # docker-engine-health-21040 expects instance=~'rpi-hub' upstream; in our setup we match job="docker-engine"
-    if rel_path.endswith("docker/docker-engine-health-21040.json"):
-        expr = expr.replace("{instance=~'rpi-hub'}", '{job="docker-engine"}')
-        expr = expr.replace('{instance=~"rpi-hub"}', '{job="docker-engine"}')
-        expr = expr.replace('{instance=~"rpi-hub.*"}', '{job="docker-engine"}')
+    if is_docker_engine_health(rel_path) and "rpi-hub" in expr:
+        expr = _patch_rpi_hub_expr(expr)
     return expr
 
 
-def _patch_vlogs_explorer_strings(s: str) -> str:
-    for old, new in _K8S_TO_HOMELAB_FIELD_MAP.items():
-        s = s.replace(old, new)
+# panels repeat the same queries/templates; cache per unique string (per worker process)
+@lru_cache(maxsize=4096)
+def _patch_rpi_hub_expr(expr: str) -> str:
+    return _RPI_HUB_SELECTOR.sub('{job="docker-engine"}', expr)
 
-    for pat in _BAD_OPTIONAL_QUERY_PATTERNS:
-        s = s.replace(pat, "")
 
-    # common variant without leading space
-    s = s.replace('AND ($query != "" or 1==1)', "")
-    return s
-
-
-def patch_logsql_for_environment(node: Any, rel_path: str) -> Any:
-    if not isinstance(node, (dict, list)):
-        return node
-
-    # apply ONLY to that dashboard file
-    if not rel_path.endswith(
-        "victorialogs/victorialogs-explorer-22759.json"
-    ) and not rel_path.endswith("victorialogs-explorer-22759.json"):
-        return node
-
-    def walk(x: Any) -> Any:
-        if isinstance(x, dict):
-            out: dict[str, Any] = {}
-            for k, v in x.items():
-                if k == "field" and isinstance(v, str):
-                    out[k] = _patch_vlogs_explorer_strings(v)
-                    continue
-
-                if isinstance(v, str) and k in (
-                    "expr",
-                    "definition",
-                    "query",
-                    "url",
-                    "legendFormat",
-                    "title",
-                ):
-                    out[k] = _patch_vlogs_explorer_strings(v)
-                    continue
-
-                if isinstance(v, str) and ("kubernetes." in v or '$query != "" or 1==1' in v):
-                    out[k] = _patch_vlogs_explorer_strings(v)
-                    continue
-
-                out[k] = walk(v)
-            return out
-
-        if isinstance(x, list):
-            return [walk(i) for i in x]
+def _patch_vlogs_explorer_strings(s: str) -> str:
+    # every pattern contains one of these; most strings (titles, urls) contain neither
+    if "kubernetes." not in s and "$query !=" not in s:
+        return s
+    return _patch_vlogs_explorer_match(s)
 
-        if isinstance(x, str) and ("kubernetes." in x or '$query != "" or 1==1' in x):
-            return _patch_vlogs_explorer_strings(x)
 
-        return x
+@lru_cache(maxsize=4096)
+def _patch_vlogs_explorer_match(s: str) -> str:
+    return _VLOGS_EXPLORER_RE.sub(lambda m: _VLOGS_EXPLORER_REPLACEMENTS[m.group(0)], s)
 
-    return walk(node)
 
+# string fields of the explorer dashboard that always carry LogsQL / field names
+_VLOGS_EXPLORER_KEYS = frozenset(
+    ("field", "expr", "definition", "query", "url", "legendFormat", "title")
+)
 
-def walk_and_patch_with_context(node: Any, rel_path: str) -> Any:
-    if isinstance(node, dict):
-        if "datasource" in node:
-            node["datasource"] = normalize_datasource_value(node["datasource"])
-        if "expr" in node:
-            node["expr"] = patch_promql_expr(node["expr"], rel_path)
 
-        node = patch_logsql_for_environment(node, rel_path)
-        return {k: walk_and_patch_with_context(v, rel_path) for k, v in node.items()}
+def _needs_vlogs_patch(s: str) -> bool:
+    return "kubernetes." in s or '$query != "" or 1==1' in s
+
+
+def is_vlogs_explorer(rel_path: str) -> bool:
+    return rel_path.endswith("victorialogs-explorer-22759.json")
+
+
+def uid_link_regex(uid_map: dict[str, str]) -> re.Pattern[str] | None:
+    """Old UIDs that actually change, embedded in a link (e.g. /d/<uid>/slug); None if none change."""
+    olds = sorted((o for o, n in uid_map.items() if o != n), key=len, reverse=True)
+    if not olds:
+        return None
+    # not part of a longer uid-like token on either side
+    return re.compile(r"(?<![\w-])(?:" + "|".join(map(re.escape, olds)) + r")(?![\w-])")
+
+
+def _patch_str(
+    s: str,
+    key: str | None,
+    uid_map: dict[str, str],
+    vlogs_explorer: bool,
+    link_re: re.Pattern[str] | None,
+) -> str:
+    if vlogs_explorer and (key in _VLOGS_EXPLORER_KEYS or _needs_vlogs_patch(s)):
+        s = _patch_vlogs_explorer_strings(s)
+    if link_re is not None and key in _LINK_KEYS:
+        s = link_re.sub(lambda m: uid_map[m.group(0)], s)
+    # internal dashboard links: a string value that is exactly an old UID
+    return uid_map.get(s, s)
+
+
+def walk_and_patch_with_context(
+    node: Any,
+    rel_path: str,
+    uid_map: dict[str, str],
+    vlogs_explorer: bool = False,
+    link_re: re.Pattern[str] | None = None,
+) -> Any:
+    """Single pass: datasources, PromQL, explorer LogsQL (if vlogs_explorer) and internal UID links.
+
+    link_re (see uid_link_regex) additionally rewrites old UIDs embedded in link/url values.
+
+    Iterative (explicit stack) and in place; returns the patched node.
+    """
+    # exact type checks: JSON decoders only produce plain dict/list/str, never subclasses
+    if type(node) is str:
+        return _patch_str(node, None, uid_map, vlogs_explorer, link_re)
+
+    # per-file rules are decided once here, not per node
+    patch_expr = is_docker_engine_health(rel_path)
+
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if type(cur) is dict:
+            if "datasource" in cur:
+                cur["datasource"] = normalize_datasource_value(cur["datasource"])
+            if patch_expr and "expr" in cur:
+                cur["expr"] = patch_promql_expr(cur["expr"], rel_path)
+
+            for k, v in cur.items():
+                t = type(v)
+                if t is str:
+                    cur[k] = _patch_str(v, k, uid_map, vlogs_explorer, link_re)
+                elif (t is dict or t is list) and v is not _PROM_DS and v is not _VLOGS_DS:
+                    stack.append(v)
+        elif type(cur) is list:
+            for i, v in enumerate(cur):
+                t = type(v)
+                if t is str:
+                    cur[i] = _patch_str(v, None, uid_map, vlogs_explorer, link_re)
+                elif t is dict or t is list:
+                    stack.append(v)
+    return node
 
-    if isinstance(node, list):
-        return [walk_and_patch_with_context(x, rel_path) for x in node]
 
-    return node
+def uid_link_needles(uid_map: dict[str, str]) -> tuple[bytes, ...] | None:
+    """Old UIDs that actually change, as raw bytes; None if one can't be matched raw."""
+    needles = []
+    for old, new in uid_map.items():
+        if old == new:
+            continue
+        if not _UID_ALLOWED.match(old):
+            return None  # may be JSON-escaped on disk
+        # unquoted: the uid may be embedded in a link url
+        needles.append(old.encode())
+    return tuple(needles)
+
+
+def needs_walk(raw: bytes, rel_path: str, link_needles: tuple[bytes, ...] | None) -> bool:
+    """Cheap raw-bytes check: False only if the patch walk is guaranteed to be a no-op."""
+    if link_needles is None or b"\\u" in raw or is_vlogs_explorer(rel_path):
+        return True
+    if b'"datasource"' in raw:
+        return True
+    if is_docker_engine_health(rel_path) and b"rpi-hub" in raw:
+        return True
+    return any(n in raw for n in link_needles)
+
+
+def read_dashboard(path: Path) -> tuple[bytes, str | None]:
+    """Read raw bytes and probe the old top-level uid (phase 1, runs in a thread)."""
+    raw = path.read_bytes()
+    uid = loads_json(raw).get("uid")
+    return raw, (str(uid) if uid else None)
+
+
+# per-process link rewrite state, set once by init_uid_links (pool initializer) instead of
+# pickling the map and recompiling the alternation for every dashboard
+_uid_map: dict[str, str] = {}
+_link_needles: tuple[bytes, ...] | None = ()
+_link_re: re.Pattern[str] | None = None
+
+
+def init_uid_links(uid_map: dict[str, str]) -> None:
+    global _uid_map, _link_needles, _link_re
+    _uid_map = uid_map
+    _link_needles = uid_link_needles(uid_map)
+    _link_re = uid_link_regex(uid_map)
+
+
+def normalize_one(raw: bytes, rel: str, new_uid: str) -> tuple[bytes | None, bool]:
+    """Return (normalized content or None if byte-identical on disk, unresolved DS_PROMETHEUS ref).
+
+    Requires init_uid_links() to have run in this process.
+    """
+    data = loads_json(raw)
+    data["uid"] = new_uid
+    data["id"] = None
+
+    if needs_walk(raw, rel, _link_needles):
+        data = walk_and_patch_with_context(data, rel, _uid_map, is_vlogs_explorer(rel), _link_re)
+    if not KEEP_INPUTS:
+        data.pop("__inputs", None)
+    out = dump_json(data)
+    # checked on the bytes we just produced instead of re-reading the written file
+    bad = _BAD_PROM_UID in out
+    return (None if out == raw else out), bad
+
+
+def parallel_map(
+    fn: Callable[..., Any],
+    *iterables: Iterable[Any],
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> list[Any]:
+    """Order-preserving map over dashboards; uses one process per core when there is work to share.
+
+    initializer(*initargs) runs once per worker process (or once in-process for the serial path).
+    """
+    args = [list(it) for it in iterables]
+    workers = min(len(args[0]) if args else 0, os.cpu_count() or 1)
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return list(map(fn, *args))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as ex:
+        return list(ex.map(fn, *args))
 
 
 def main() -> int:
@@ -198,45 +377,53 @@ def main() -> int:
         print(f"ERROR: dashboards root not found: {root}")
         return 1
 
-    docs: list[tuple[Path, dict]] = []
+    files = list(iter_json_files(root))
+    rels: list[str] = []
+    new_uids: list[str] = []
     uid_map: dict[str, str] = {}
 
-    # phase 1: compute deterministic uid per file and build old->new mapping
-    for f in iter_json_files(root):
-        data = json.loads(f.read_text(encoding="utf-8"))
-        old_uid = data.get("uid")
+    # phase 1: read files (threads overlap SD card latency), compute deterministic uid per file
+    # and build old->new mapping; the raw bytes are handed to phase 2 instead of re-reading
+    with ThreadPoolExecutor(max_workers=min(8, len(files) or 1)) as ex:
+        loaded = list(ex.map(read_dashboard, files))
 
-        rel = f.resolve().relative_to(root.resolve())
-        new_uid = ensure_uid(slugify_uid(str(rel.with_suffix("")).replace("/", "-")))
+    for f, (_, old_uid) in zip(files, loaded, strict=True):
+        # files come from walking root, so a lexical relative path is enough (no resolve() stats)
+        rel = f.relative_to(root).as_posix()
+        new_uid = ensure_uid(slugify_uid(rel.removesuffix(".json").replace("/", "-")))
 
         if old_uid:
-            uid_map[str(old_uid)] = new_uid
-
-        data["uid"] = new_uid
-        data["id"] = None
-        docs.append((f, data))
-
-    # phase 2: patch datasources/queries and rewrite internal links using uid_map
-    final_docs: list[tuple[Path, dict]] = []
-    for f, data in docs:
-        rel = str(f.resolve().relative_to(root.resolve())).replace("\\", "/")
-        data = walk_and_patch_with_context(data, rel)
-
-        raw_json = json.dumps(data)
-        for old, new in uid_map.items():
-            if old != new:
-                raw_json = raw_json.replace(f'"{old}"', f'"{new}"')
-
-        data = json.loads(raw_json)
-        if not KEEP_INPUTS:
-            data.pop("__inputs", None)
-
-        final_docs.append((f, data))
-
-    for f, data in final_docs:
-        f.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
-
-    print(f"Normalized {len(final_docs)} dashboards. Fixed {len(uid_map)} potential UID links.")
+            uid_map[old_uid] = new_uid
+
+        rels.append(rel)
+        new_uids.append(new_uid)
+
+    # phase 2: patch datasources/queries and rewrite internal links using uid_map (one file per worker)
+    outputs = parallel_map(
+        normalize_one,
+        [raw for raw, _ in loaded],
+        rels,
+        new_uids,
+        initializer=init_uid_links,
+        initargs=(uid_map,),
+    )
+
+    # skip unchanged files: idempotent re-runs cause no writes (SD card wear on the Pi)
+    written = 0
+    bad_hits: list[str] = []
+    for f, rel, (out, bad) in zip(files, rels, outputs, strict=True):
+        if out is not None:
+            f.write_bytes(out)
+            written += 1
+        if bad:
+            bad_hits.append(rel)
+
+    print(
+        f"Normalized {len(files)} dashboards ({written} rewritten). "
+        f"Fixed {len(uid_map)} potential UID links."
+    )
+    if bad_hits:
+        print(f"WARN: unresolved datasource uid ${{{PROM_UID}}} left in: {', '.join(bad_hits)}")
     return 0
 
 
@@ -1,28 +1,205 @@
 # helper for robust shell/tool calls in tests
 from __future__ import annotations
 
+import http.client
 import json
 import os
+import random
+import socket
 import subprocess
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import cache, lru_cache
 from pathlib import Path
 from shutil import which
+from typing import Any
+from urllib.parse import quote
+
+import yaml
+
+try:
+    # libyaml-backed loader: ~10x faster than the pure-Python SafeLoader
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback (e.g. pre-commit env)
+    orjson = None
 
 # define root of repository. This is two levels up from this file
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
+# `compose ps` results reused for back-to-back calls (fork+exec of docker compose is slow on a Pi);
+# short enough that polling loops with a real sleep always see fresh state
+_PS_CACHE_TTL_S = 0.25
+_PS_CACHE: dict[tuple[str | int, ...], tuple[float, list[dict]]] = {}
+
+DOCKER_SOCKET = os.environ.get("DOCKER_SOCKET", "/var/run/docker.sock")
+
+
+def loads_json(raw: str | bytes) -> Any:
+    """json.loads equivalent using orjson when installed (faster on the Pi's ARM cores).
+
+    Decode errors are json.JSONDecodeError either way (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def safe_yaml_load(text: str) -> Any:
+    """yaml.safe_load equivalent using the C loader when PyYAML was built with libyaml."""
+    return yaml.load(text, Loader=_SafeLoader)
+
 
+@cache
 def which_ok(binary: str) -> bool:
-    """Check if a binary/tool is available in PATH."""
+    """Check if a binary/tool is available in PATH (PATH scanned once per binary and session)."""
     return which(binary) is not None
 
 
+# retry() policy for HTTP probes of services that may still be starting: first re-probe after
+# ~0.25 s, doubling up to 8 s with +/-50% jitter (fast first success, few probes when down)
+COLD_START_BACKOFF: dict[str, float] = {
+    "interval_s": 0.25,
+    "backoff": 2.0,
+    "max_interval_s": 8.0,
+    "jitter": 0.5,
+}
+
+
+class Fatal(AssertionError):
+    """A failed check that waiting won't fix; `retry` re-raises it without further attempts."""
+
+
+# 4xx answers that mean "wrong URL/config/credentials", not "still starting" (408/429 are
+# transient and stay retryable like any other non-200).
+UNRECOVERABLE_STATUS = frozenset({401, 403, 404, 405})
+
+
+class RetryAfter(AssertionError):
+    """A failed check with a server hint (Retry-After): `retry` waits at least `delay_s`."""
+
+    def __init__(self, msg: str, delay_s: float) -> None:
+        super().__init__(msg)
+        self.delay_s = delay_s
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date); None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def assert_http_200(
+    status: int,
+    body: str,
+    url: str,
+    name: str | None = None,
+    *,
+    headers: Mapping[str, str] | None = None,
+) -> None:
+    """
+    Assert a 200 answer; raise `Fatal` for statuses in UNRECOVERABLE_STATUS. With response
+    `headers`, a 429/503 carrying Retry-After raises `RetryAfter` so `retry` honours the hint.
+    """
+    if status == 200:
+        return
+    prefix = f"{name}: " if name else ""
+    msg = f"{prefix}GET {url} expected 200, got {status}. body[:400]={body[:400]!r}"
+    if status in UNRECOVERABLE_STATUS:
+        raise Fatal(msg)
+    if status in (429, 503) and headers is not None:
+        hint = parse_retry_after(headers.get("Retry-After"))
+        if hint is not None:
+            raise RetryAfter(f"{msg} retry-after={hint:g}s", hint)
+    raise AssertionError(msg)
+
+
+def retry(
+    assert_fn: Callable[[], object],
+    timeout_s: float = 60,
+    interval_s: float = 2.5,
+    *,
+    backoff: float = 1.5,
+    jitter: float = 0.2,
+    max_interval_s: float | None = None,
+    on_retry: Callable[[], None] | None = None,
+) -> None:
+    """
+    Call `assert_fn` until it stops raising AssertionError or `timeout_s` elapses.
+
+    The first attempt runs immediately. Sleeps then grow from `interval_s` by `backoff` per
+    attempt (capped at `max_interval_s`, default 4x `interval_s`) and are spread by +/- `jitter`
+    so parallel workers don't poll in lockstep. `on_retry` runs after each failed attempt,
+    e.g. to drop cached state. A `RetryAfter` failure stretches the next sleep to the server's
+    hint. Re-raises the last AssertionError on timeout; a `Fatal` one is re-raised immediately.
+    """
+    cap = 4 * interval_s if max_interval_s is None else max_interval_s
+    deadline = time.monotonic() + timeout_s
+    attempt = 0
+    while True:
+        try:
+            assert_fn()
+            return
+        except Fatal:
+            raise
+        except AssertionError as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            if on_retry is not None:
+                on_retry()
+            hint = e.delay_s if isinstance(e, RetryAfter) else 0.0
+        # Never sleep past the deadline: the last sleep is cut short and followed by one
+        # final attempt at t=deadline instead of giving up mid-interval.
+        delay = min(interval_s * backoff**attempt, cap) * random.uniform(1 - jitter, 1 + jitter)
+        delay = max(delay, hint)
+        time.sleep(min(delay, remaining))
+        attempt += 1
+
+
+def probe_all(
+    fn: Callable[[str], Any], urls: Iterable[str], max_workers: int = 8
+) -> dict[str, Any]:
+    """
+    Run independent I/O-bound probes `fn(url)` concurrently; wall time ~ the slowest probe.
+
+    Maps each url to its result, or to the exception the probe raised (returned, not raised,
+    so one failing endpoint doesn't hide the others; callers report it with its cause).
+    """
+
+    def _safe(url: str) -> Any:
+        try:
+            return fn(url)
+        except Exception as e:  # noqa: BLE001 - handed back to the caller for its report
+            return e
+
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as ex:
+        return dict(zip(urls, ex.map(_safe, urls), strict=True))
+
+
 def run(
     cmd: list[str], *, cwd: Path | None = None, env: dict | None = None
 ) -> subprocess.CompletedProcess:
     """Run a command and capture stdout/stderr (no exception on non-zero)."""
-    merged_env = os.environ.copy()
-    if env:
-        merged_env.update(env)
+    # env=None lets the child inherit os.environ directly, without copying it per call
+    merged_env = (os.environ | env) if env else None
     return subprocess.run(
         cmd,
         cwd=str(cwd or REPO_ROOT),
@@ -38,25 +215,44 @@ def compose_cmd() -> list[str] | None:
     Return docker compose command as list, or None if not available.
     Prefers plugin-style: `docker compose`.
     Falls back to legacy `docker-compose` if installed.
+    The probe runs once per test session; callers get their own list.
     """
+    cmd = _probe_compose_cmd()
+    return list(cmd) if cmd else None
+
+
+@lru_cache(maxsize=1)
+def _probe_compose_cmd() -> tuple[str, ...] | None:
+    # `docker compose version` is a fork+exec (~100 ms on a Pi); availability can't change mid-run
     if not which_ok("docker"):
         return None
 
     res = run(["docker", "compose", "version"])
     if res.returncode == 0:
-        return ["docker", "compose"]
+        return ("docker", "compose")
 
     if which_ok("docker-compose"):
-        return ["docker-compose"]
+        return ("docker-compose",)
 
     return None
 
 
+class ComposePsError(RuntimeError):
+    """`docker compose ps` exited non-zero; keeps the exit code and stderr for diagnostics."""
+
+    def __init__(self, returncode: int, stdout: str, stderr: str) -> None:
+        super().__init__(f"docker compose ps failed (rc={returncode}):\n{stdout}\n{stderr}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+@lru_cache(maxsize=1)
 def find_monitoring_compose_file() -> Path:
     """
     Determine the monitoring compose file path.
     Prefer new GitOps target layout: stacks/monitoring/compose/docker-compose.yml.
     Fallback to legacy layout: monitoring/compose/docker-compose.yml.
+    Resolved once per session (the layout doesn't change mid-run).
     """
     candidates = [
         REPO_ROOT / "stacks" / "monitoring" / "compose" / "docker-compose.yml",
@@ -79,34 +275,52 @@ def compose_ps_json(*, compose_file: Path) -> list[dict]:
     This helper supports both.
 
     We use --all to include one-shot/exited containers (e.g. config render jobs).
+    Results are cached for _PS_CACHE_TTL_S seconds per (command, compose file, file mtime),
+    so editing the compose file invalidates the cache immediately.
     """
     cmd = compose_cmd()
     if not cmd:
         raise RuntimeError("docker compose not available")
 
-    if not compose_file.exists():
-        raise FileNotFoundError(f"Compose file missing: {compose_file}")
+    try:
+        mtime_ns = compose_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Compose file missing: {compose_file}") from None
+
+    full_cmd = [*cmd, "-f", str(compose_file), "ps", "--all", "--format", "json"]
+    key = (*full_cmd, mtime_ns)
+    hit = _PS_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < _PS_CACHE_TTL_S:
+        return list(hit[1])
+
+    rows = _run_compose_ps(full_cmd)
+    _PS_CACHE[key] = (time.monotonic(), rows)
+    return list(rows)
 
-    res = run([*cmd, "-f", str(compose_file), "ps", "--all", "--format", "json"])
+
+def _run_compose_ps(full_cmd: list[str]) -> list[dict]:
+    res = run(full_cmd)
     if res.returncode != 0:
-        raise RuntimeError(f"docker compose ps failed:\n{res.stdout}\n{res.stderr}")
+        raise ComposePsError(res.returncode, res.stdout or "", res.stderr or "")
 
     raw = (res.stdout or "").strip()
     if not raw:
         return []
 
-    # 1) Try JSON array/dict first
-    try:
-        data = json.loads(raw)
+    # Pick the format from the first char instead of parsing and catching JSONDecodeError:
+    # 1) JSON array, or a single JSON object (no second object starting on a new line)
+    if raw[0] == "[" or (raw[0] == "{" and "\n{" not in raw):
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Failed to parse compose ps JSON: {e}\nOutput:\n{raw}") from e
         if isinstance(data, list):
             return data
         if isinstance(data, dict):
             return [data]
         raise RuntimeError(f"Unexpected compose ps json type: {type(data)}")
-    except json.JSONDecodeError:
-        pass
 
-    # 2) Fallback: NDJSON (one object per line)
+    # 2) NDJSON (one object per line)
     rows: list[dict] = []
     for i, line in enumerate(raw.splitlines(), start=1):
         line = line.strip()
@@ -127,6 +341,29 @@ def compose_ps_json(*, compose_file: Path) -> list[dict]:
     return rows
 
 
+class ComposePs:
+    """
+    `compose_ps_json` bound to one compose file, meant to be shared for a whole session.
+
+    Uses the module's `compose ps` cache (_PS_CACHE_TTL_S) rather than a second one of its own;
+    `ps(force=True)` and `ps.invalidate()` drop this file's cached rows so the next call re-runs
+    `docker compose ps`.
+    """
+
+    def __init__(self, compose_file: Path) -> None:
+        self.compose_file = compose_file
+
+    def __call__(self, *, force: bool = False) -> list[dict]:
+        if force:
+            self.invalidate()
+        return compose_ps_json(compose_file=self.compose_file)
+
+    def invalidate(self) -> None:
+        path = str(self.compose_file)
+        for key in [k for k in _PS_CACHE if path in k]:
+            del _PS_CACHE[key]
+
+
 def compose_services_by_name(ps_rows: list[dict]) -> dict[str, dict]:
     """
     Key compose `ps --format json` rows by service name.
@@ -149,3 +386,66 @@ def compose_container_name(rows_by_service: dict[str, dict], service: str) -> st
         return None
     name = row.get("Name") or row.get("name")
     return str(name) if name else None
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over an AF_UNIX socket (Docker Engine API)."""
+
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._unix_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._unix_path)
+        self.sock = sock
+
+
+class NoSuchContainerError(RuntimeError):
+    """`docker_inspect` target does not exist (Engine API 404)."""
+
+
+def _inspect_via_socket(name: str) -> dict | None:
+    """GET /containers/<name>/json on the Engine socket; None if the socket is unusable."""
+    if not os.access(DOCKER_SOCKET, os.R_OK | os.W_OK):
+        return None
+    conn = _UnixHTTPConnection(DOCKER_SOCKET)
+    try:
+        conn.request("GET", f"/containers/{quote(name, safe='')}/json")
+        resp = conn.getresponse()
+        body = resp.read()
+    except (OSError, http.client.HTTPException):  # incl. truncated/garbled responses
+        return None
+    finally:
+        conn.close()
+    if resp.status == 404:
+        raise NoSuchContainerError(f"docker inspect: no such container: {name}")
+    if resp.status != 200:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:  # garbled 200 body: let the CLI answer instead
+        return None
+
+
+def docker_inspect(name: str) -> dict:
+    """
+    Return the `docker inspect` object for a container (State, Mounts, Config, ...).
+
+    Talks to the Docker Engine API over its UNIX socket (no fork+exec of the docker CLI);
+    falls back to `docker inspect` when the socket is missing, not accessible or answers
+    garbage. Raises NoSuchContainerError if the container does not exist, RuntimeError if it
+    can't be inspected at all; test callers turn both into failures (pytest.fail).
+    """
+    data = _inspect_via_socket(name)
+    if data is not None:
+        return data
+
+    if not which_ok("docker"):
+        raise RuntimeError(f"cannot inspect {name}: no Docker socket access and no docker CLI")
+    res = run(["docker", "inspect", name])
+    if res.returncode != 0:
+        raise RuntimeError(f"docker inspect {name} failed:\n{res.stdout}\n{res.stderr}")
+    rows = json.loads(res.stdout)
+    return rows[0]
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import copy
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
-import yaml
+from tests._helpers import safe_yaml_load
 
 
 def render_compose(compose_file: Path, env_file: Path | None = None) -> dict:
+    """
+    Render `docker compose config` as a dict.
+
+    Rendered once per (compose file, env file) per test session; each caller gets its own copy.
+    """
+    return copy.deepcopy(
+        _render_compose_cached(str(compose_file), str(env_file) if env_file is not None else None)
+    )
+
+
+@lru_cache(maxsize=8)
+def _render_compose_cached(compose_file: str, env_file: str | None) -> dict:
     cmd = ["docker", "compose"]
     if env_file is not None:
-        cmd += ["--env-file", str(env_file)]
-    cmd += ["-f", str(compose_file), "config"]
+        cmd += ["--env-file", env_file]
+    cmd += ["-f", compose_file, "config"]
 
     res = subprocess.run(cmd, capture_output=True, text=True)
     if res.returncode != 0:
         raise RuntimeError(f"docker compose config failed:\n{res.stderr}")
 
-    return yaml.safe_load(res.stdout)
+    return safe_yaml_load(res.stdout)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+# Host-reachable monitoring endpoints (Pi). IPv4 loopback for determinism.
+# Single source of truth for postdeploy tests; env overrides stay at the call sites.
+ALERTMANAGER_BASE = "http://127.0.0.1:9093"
+VICTORIAMETRICS_BASE = "http://127.0.0.1:8428"
+VMAGENT_BASE = "http://127.0.0.1:8429"
+VMALERT_BASE = "http://127.0.0.1:8880"
+GRAFANA_BASE = "http://127.0.0.1:3000"
+VLOGS_BASE = "http://127.0.0.1:9428"
+
+# (name, url) of endpoints that must return 200 when the service is healthy.
+READY_ENDPOINTS: tuple[tuple[str, str], ...] = (
+    # Alertmanager
+    ("alertmanager-ready", f"{ALERTMANAGER_BASE}/-/ready"),
+    ("alertmanager-healthy", f"{ALERTMANAGER_BASE}/-/healthy"),
+    # VictoriaMetrics single-node
+    ("victoriametrics-ready", f"{VICTORIAMETRICS_BASE}/-/ready"),
+    ("victoriametrics-health", f"{VICTORIAMETRICS_BASE}/health"),
+    # vmagent
+    ("vmagent-ready", f"{VMAGENT_BASE}/-/ready"),
+    ("vmagent-health", f"{VMAGENT_BASE}/health"),
+    # vmalert
+    ("vmalert-ready", f"{VMALERT_BASE}/-/ready"),
+    ("vmalert-health", f"{VMALERT_BASE}/health"),
+    # VictoriaLogs:
+    ("victorialogs-insert-ready", f"{VLOGS_BASE}/insert/ready"),
+    ("victorialogs-metrics", f"{VLOGS_BASE}/metrics"),
+)
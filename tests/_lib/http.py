@@ -3,6 +3,13 @@ from __future__ import annotations
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# one pooled keep-alive session for all helpers: polling loops reuse connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
 
 
 def wait_http_ok(url: str, timeout_s: int = 45, allow_redirects: bool = True) -> None:
@@ -16,12 +23,12 @@ def wait_http_ok(url: str, timeout_s: int = 45, allow_redirects: bool = True) ->
 
     Raises AssertionError on timeout.
     """
-    t0 = time.time()
+    t0 = time.monotonic()
     last: str | None = None
 
-    while time.time() - t0 < timeout_s:
+    while time.monotonic() - t0 < timeout_s:
         try:
-            r = requests.get(url, timeout=3, allow_redirects=allow_redirects)
+            r = _SESSION.get(url, timeout=3, allow_redirects=allow_redirects)
             if 200 <= r.status_code < 400:
                 return
             # Treat all non-2xx/3xx as not-ready; include short body for diagnostics
@@ -34,6 +41,6 @@ def wait_http_ok(url: str, timeout_s: int = 45, allow_redirects: bool = True) ->
 
 
 def get_json(url: str) -> dict:
-    r = requests.get(url, timeout=5)
+    r = _SESSION.get(url, timeout=5)
     r.raise_for_status()
     return r.json()
@@ -3,7 +3,57 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure repository root is on sys.path so "import tests._helpers" works reliably
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip `requires_docker` tests at collection when docker is missing (no fixture setup)."""
+    from tests._helpers import which_ok
+
+    if which_ok("docker"):
+        return
+    skip_docker = pytest.mark.skip(reason="docker not available")
+    for item in items:
+        if item.get_closest_marker("requires_docker") is not None:
+            item.add_marker(skip_docker)
+
+
+@pytest.fixture(scope="session")
+def compose_file() -> Path:
+    """Monitoring compose file path, resolved once per session."""
+    from tests._helpers import find_monitoring_compose_file
+
+    return find_monitoring_compose_file()
+
+
+@pytest.fixture(scope="session")
+def rendered_compose(compose_file: Path) -> dict:
+    """
+    Monitoring compose rendered by `docker compose config` once per session (guards).
+    Treat as read-only: it is shared.
+
+    For local WSL runs you can point to a dummy env file (.env.example next to the compose
+    file), since docker compose config will fail on missing vars. Keep it minimal & non-secret.
+    """
+    from tests._lib.compose import render_compose
+
+    env_example = compose_file.parent / ".env.example"
+    return render_compose(compose_file, env_file=env_example if env_example.exists() else None)
+
+
+@pytest.fixture(scope="session")
+def compose_ps(compose_file: Path):
+    """
+    Session-wide `docker compose ps` snapshot of the monitoring stack (tests._helpers.ComposePs).
+
+    Call `compose_ps()` for rows at most _PS_CACHE_TTL_S (0.25 s) old; retry loops pass
+    `compose_ps.invalidate` as `on_retry` so every retry after a failed assertion sees fresh state.
+    """
+    from tests._helpers import ComposePs
+
+    return ComposePs(compose_file)
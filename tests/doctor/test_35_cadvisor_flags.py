@@ -6,11 +6,27 @@ from pathlib import Path
 
 import pytest
 
-from tests._helpers import find_monitoring_compose_file, run, which_ok
+from tests._helpers import run, which_ok
 
-COMPOSE_FILE: Path = find_monitoring_compose_file()
 SERVICE_NAME = "cadvisor"
 
+# Safe placeholders for compose variable expansion (no secrets). run() merges, never mutates.
+_COMPOSE_RENDER_ENV: dict[str, str] = {
+    "COMPOSE_PROJECT_NAME": "homelab-home-prod-mon",
+    "TZ": "Europe/Berlin",
+    "GRAFANA_ADMIN_USER": "admin",
+    "GRAFANA_ADMIN_PASSWORD": "changeme",
+    "ALERT_EMAIL_TO": "devnull@example.invalid",
+    "ALERT_SMTP_AUTH_USERNAME": "devnull@example.invalid",
+    "ALERT_SMTP_AUTH_PASSWORD": "changeme",
+    "ALERT_SMTP_FROM": "alerts@example.invalid",
+    "ALERT_SMTP_SMARTHOST": "smtp.example.invalid:587",
+    "ALERT_SMTP_REQUIRE_TLS": "true",
+}
+
+# help output flag lines; the greedy class already ends at a word boundary
+_FLAG_RE = re.compile(r"^-([A-Za-z0-9_]+)")
+
 
 def _compose_cmd() -> list[str] | None:
     if not which_ok("docker"):
@@ -32,21 +48,9 @@ def _compose_config_json(compose_file: Path) -> dict:
     if not compose_file.exists():
         pytest.skip(f"compose file not found: {compose_file}")
 
-    # Provide safe placeholders for variable expansion (no secrets).
-    env = {
-        "COMPOSE_PROJECT_NAME": "homelab-home-prod-mon",
-        "TZ": "Europe/Berlin",
-        "GRAFANA_ADMIN_USER": "admin",
-        "GRAFANA_ADMIN_PASSWORD": "changeme",
-        "ALERT_EMAIL_TO": "devnull@example.invalid",
-        "ALERT_SMTP_AUTH_USERNAME": "devnull@example.invalid",
-        "ALERT_SMTP_AUTH_PASSWORD": "changeme",
-        "ALERT_SMTP_FROM": "alerts@example.invalid",
-        "ALERT_SMTP_SMARTHOST": "smtp.example.invalid:587",
-        "ALERT_SMTP_REQUIRE_TLS": "true",
-    }
-
-    res = run([*cmd, "-f", str(compose_file), "config", "--format", "json"], env=env)
+    res = run(
+        [*cmd, "-f", str(compose_file), "config", "--format", "json"], env=_COMPOSE_RENDER_ENV
+    )
     if res.returncode != 0:
         # Some older compose builds may not support --format json.
         pytest.skip(
@@ -64,9 +68,58 @@ def _compose_config_json(compose_file: Path) -> dict:
     return data
 
 
-def _image_present_locally(image: str) -> bool:
-    res = run(["docker", "image", "inspect", image])
-    return res.returncode == 0
+@pytest.fixture(scope="session")
+def compose_cfg(compose_file: Path) -> dict:
+    """Rendered compose config, computed once per session (one `docker compose config` run)."""
+    if not which_ok("docker"):
+        pytest.skip("docker not available in PATH")
+    return _compose_config_json(compose_file)
+
+
+@pytest.fixture(scope="session")
+def local_images() -> dict[str, str]:
+    """Local image ref (repo:tag and repo@digest) -> image id, from one `docker images` call."""
+    if not which_ok("docker"):
+        pytest.skip("docker not available in PATH")
+    res = run(
+        [
+            "docker",
+            "images",
+            "--no-trunc",
+            "--format",
+            "{{.Repository}}:{{.Tag}}\t{{.ID}}\n{{.Repository}}@{{.Digest}}\t{{.ID}}",
+        ]
+    )
+    if res.returncode != 0:
+        return {}
+    refs: dict[str, str] = {}
+    for line in res.stdout.splitlines():
+        ref, _, image_id = line.strip().partition("\t")
+        if ref and image_id:
+            refs[ref] = image_id
+    return refs
+
+
+def _listing_ref(image: str) -> str:
+    """
+    The form `docker images` lists a compose ref under: no docker.io/library/ prefix, implicit
+    :latest spelled out, and only the digest for repo:tag@digest pins.
+    """
+    for prefix in ("docker.io/library/", "docker.io/", "index.docker.io/library/"):
+        if image.startswith(prefix):
+            image = image.removeprefix(prefix)
+            break
+    name, at, digest = image.partition("@")
+    repo, colon, tag = name.rpartition(":")
+    if not colon or "/" in tag:  # no tag (a ":" before a "/" is a registry port)
+        repo, tag = name, ""
+    if at:
+        return f"{repo}@{digest}"
+    return f"{repo}:{tag or 'latest'}"
+
+
+def _local_image_id(image: str, local_images: dict[str, str]) -> str | None:
+    return local_images.get(_listing_ref(image))
 
 
 def _cadvisor_help(image: str) -> str:
@@ -79,14 +132,35 @@ def _cadvisor_help(image: str) -> str:
     return out
 
 
+def _cadvisor_help_cached(image: str, image_id: str, cache: pytest.Cache) -> str:
+    """
+    `--help` output is a pure function of the image content: keep it in the pytest cache
+    (.pytest_cache) keyed by image id, so repeat runs skip the slow `docker run`.
+    """
+    key = f"cadvisor-help/{image_id.replace(':', '_')}"
+    help_text = cache.get(key, None)
+    if not isinstance(help_text, str):
+        help_text = _cadvisor_help(image)
+        cache.set(key, help_text)
+    return help_text
+
+
+def _cadvisor_help_for(image: str, image_id: str, config: pytest.Config) -> str:
+    # run-tests.sh passes `-p no:cacheprovider` by default: then config has no .cache at all
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        return _cadvisor_help(image)
+    return _cadvisor_help_cached(image, image_id, cache)
+
+
 def _supported_flags_from_help(help_text: str) -> set[str]:
     # Matches help output lines like:
     #   -housekeeping_interval duration
     #   -docker_only
     supported: set[str] = set()
+    match = _FLAG_RE.match
     for line in help_text.splitlines():
-        line = line.strip()
-        m = re.match(r"^-([A-Za-z0-9_]+)\b", line)
+        m = match(line.strip())
         if m:
             supported.add(m.group(1))
     return supported
@@ -133,25 +207,78 @@ def _extract_image_and_flags(cfg: dict) -> tuple[str, list[str]]:
 
 
 @pytest.mark.doctor
-def test_cadvisor_flags_are_supported_by_pinned_image():
-    if not which_ok("docker"):
-        pytest.skip("docker not available in PATH")
+def test_help_lookup_works_without_cacheprovider(
+    pytestconfig: pytest.Config, monkeypatch: pytest.MonkeyPatch
+):
+    """Same state as a run with `-p no:cacheprovider` (run-tests.sh default)."""
+    monkeypatch.delattr(pytestconfig, "cache", raising=False)
+    calls: list[str] = []
+    monkeypatch.setattr(
+        f"{__name__}._cadvisor_help", lambda image: calls.append(image) or "-docker_only\n"
+    )
+
+    assert _cadvisor_help_for("cadvisor:test", "sha256:ab", pytestconfig) == "-docker_only\n"
+    assert calls == ["cadvisor:test"]
+
+
+@pytest.mark.doctor
+def test_help_cache_is_keyed_by_listed_image_id(monkeypatch: pytest.MonkeyPatch):
+    """The id comes from the `docker images` listing: no extra docker call per lookup."""
 
-    cfg = _compose_config_json(COMPOSE_FILE)
-    image, flags = _extract_image_and_flags(cfg)
+    class _Cache(dict):  # the pytest.Cache subset used here
+        def set(self, key: str, value: object) -> None:
+            self[key] = value
+
+    store = _Cache()
+    calls: list[str] = []
+    monkeypatch.setattr(
+        f"{__name__}._cadvisor_help", lambda image: calls.append(image) or "-docker_only\n"
+    )
+
+    for _ in range(2):
+        assert _cadvisor_help_cached("cadvisor:test", "sha256:ab", store) == "-docker_only\n"
+    assert calls == ["cadvisor:test"]
+    assert list(store) == ["cadvisor-help/sha256_ab"]
+
+
+@pytest.mark.doctor
+@pytest.mark.parametrize(
+    ("image", "listed"),
+    [
+        ("ghcr.io/google/cadvisor:0.56.2", "ghcr.io/google/cadvisor:0.56.2"),
+        ("cadvisor", "cadvisor:latest"),
+        ("docker.io/library/nginx", "nginx:latest"),
+        ("docker.io/grafana/grafana:11", "grafana/grafana:11"),
+        ("localhost:5000/x", "localhost:5000/x:latest"),
+        ("x:1@sha256:ab", "x@sha256:ab"),
+    ],
+)
+def test_listing_ref_matches_docker_images_format(image: str, listed: str):
+    assert _listing_ref(image) == listed
+
+
+@pytest.mark.doctor
+def test_cadvisor_flags_are_supported_by_pinned_image(
+    compose_cfg: dict,
+    compose_file: Path,
+    local_images: dict[str, str],
+    pytestconfig: pytest.Config,
+):
+    image, flags = _extract_image_and_flags(compose_cfg)
 
     if not flags:
         pytest.skip("No cadvisor command flags configured")
 
-    if not _image_present_locally(image):
+    image_id = _local_image_id(image, local_images)
+    if image_id is None:
         pytest.skip(f"cadvisor image not present locally: {image} (run: docker pull {image})")
 
-    help_text = _cadvisor_help(image)
+    help_text = _cadvisor_help_for(image, image_id, pytestconfig)
     supported = _supported_flags_from_help(help_text)
 
     unknown = [f for f in flags if f not in supported]
     assert not unknown, (
         f"cadvisor: unsupported flags for image '{image}': {unknown}\n"
         f"Reproduce: docker run --rm {image} --help\n"
-        f"Compose: {COMPOSE_FILE}"
+        f"Compose: {compose_file}"
     )
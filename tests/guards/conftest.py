@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+
+import pytest
+
+from tests._helpers import REPO_ROOT
+
+IGNORE_DIRS = frozenset({".git", ".venv", "__pycache__", ".pytest_cache", "node_modules"})
+
+
+def _iter_repo_files(root: str) -> Iterator[str]:
+    """Yield repo-relative posix paths of all files; ignored dirs are pruned, never entered."""
+    prefix = len(root) + 1
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.name in IGNORE_DIRS:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path[prefix:].replace(os.sep, "/")
+
+
+@pytest.fixture(scope="session")
+def repo_files() -> tuple[str, ...]:
+    """Repo-relative posix paths of all files, walked once per session for all guards."""
+    return tuple(_iter_repo_files(str(REPO_ROOT)))
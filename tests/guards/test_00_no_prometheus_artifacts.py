@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import mmap
 import re
 from pathlib import Path
 
@@ -13,12 +14,12 @@ BANNED_PATH_PATTERNS = [
     r"(^|/)rules(_|-)prometheus.*",  # rules_prometheus*
 ]
 
-# Hard-ban: Prometheus runtime references in infra configs.
+# Hard-ban: Prometheus runtime references in infra configs (matched multiline, case-insensitive).
 BANNED_TEXT_PATTERNS = [
-    r"(?mi)^\s*prometheus\s*:\s*$",  # compose service named prometheus
-    r"(?mi)\bprometheus/prometheus\b",  # prometheus image
-    r"(?mi)\bprometheus:9090\b",  # service endpoint
-    r"(?mi)\bhttps?://prometheus(:9090)?\b",  # URL endpoint
+    r"^\s*prometheus\s*:\s*$",  # compose service named prometheus
+    r"\bprometheus/prometheus\b",  # prometheus image
+    r"\bprometheus:9090\b",  # service endpoint
+    r"\bhttps?://prometheus(:9090)?\b",  # URL endpoint
 ]
 
 # Keep this narrow: infra configs only (avoid docs false positives).
@@ -27,44 +28,47 @@ TEXT_SCAN_FILES = [
     "stacks/monitoring/grafana/provisioning/datasources/victoriametrics.yml",
 ]
 
-IGNORE_DIRS = {".git", ".venv", "__pycache__", ".pytest_cache", "node_modules"}
-
-
-def _repo_files() -> list[Path]:
-    files: list[Path] = []
-    for p in REPO_ROOT.rglob("*"):
-        if any(part in IGNORE_DIRS for part in p.parts):
-            continue
-        if p.is_file():
-            files.append(p)
-    return files
-
-
-def test_no_prometheus_files_or_dirs_exist():
+# One alternation per scan: each path/text is searched once instead of once per pattern.
+# Paths and patterns are ASCII: re.ASCII skips Unicode class/boundary handling.
+_BANNED_PATH_RE = re.compile("|".join(f"(?:{x})" for x in BANNED_PATH_PATTERNS), re.ASCII)
+# Named groups (p<index>) map a match back to its source pattern for reporting.
+# Bytes pattern (all patterns are ASCII): files are scanned without a UTF-8 decode pass, and
+# \b, \s and IGNORECASE are ASCII-only already (bytes patterns imply re.ASCII).
+_BANNED_TEXT_RE = re.compile(
+    "|".join(f"(?P<p{i}>{x})" for i, x in enumerate(BANNED_TEXT_PATTERNS)).encode("ascii"),
+    re.MULTILINE | re.IGNORECASE,
+)
+# prefilter; case-insensitive like the patterns (a mapped buffer can't be cheaply .lower()ed)
+_PROMETHEUS_ANY_CASE = re.compile(rb"prometheus", re.IGNORECASE)
+
+
+def test_no_prometheus_files_or_dirs_exist(repo_files: tuple[str, ...]):
     bad: list[str] = []
-    patterns = [re.compile(x) for x in BANNED_PATH_PATTERNS]
 
-    for f in _repo_files():
-        rel = f.relative_to(REPO_ROOT).as_posix()
-        for pat in patterns:
-            if pat.search(rel):
-                bad.append(rel)
-                break
+    for rel in repo_files:
+        if _BANNED_PATH_RE.search(rel):
+            bad.append(rel)
 
     assert not bad, "Prometheus artifacts found:\n" + "\n".join(sorted(bad))
 
 
 def test_no_prometheus_runtime_references_in_infra_configs():
-    pats = [re.compile(x) for x in BANNED_TEXT_PATTERNS]
     hits: list[str] = []
 
     for rel in TEXT_SCAN_FILES:
         f = REPO_ROOT / rel
         if not f.exists():
             continue
-        txt = f.read_text(encoding="utf-8", errors="replace")
-        for pat in pats:
-            if pat.search(txt):
-                hits.append(f"{rel} matched {pat.pattern}")
+        if f.stat().st_size == 0:
+            continue  # mmap can't map empty files; nothing to match anyway
+        # scan the mapped page cache directly: no Python-side copy of the file
+        with f.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # every banned pattern contains "prometheus": skip the regex pass when it can't match
+            if not _PROMETHEUS_ANY_CASE.search(mm):
+                continue
+            matched = {m.lastgroup for m in _BANNED_TEXT_RE.finditer(mm)}
+        for i, pattern in enumerate(BANNED_TEXT_PATTERNS):
+            if f"p{i}" in matched:
+                hits.append(f"{rel} matched {pattern}")
 
     assert not hits, "Prometheus runtime references found:\n" + "\n".join(hits)
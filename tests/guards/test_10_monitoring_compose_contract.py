@@ -1,40 +1,49 @@
+# Compose contract: VictoriaMetrics coverage must exist.
+# This guard checks the monitoring stack shape (services present) and that banned services are absent,
+# plus that Grafana datasources don't point at a Prometheus runtime.
+
 from __future__ import annotations
 
 from pathlib import Path
 
-from tests._lib.compose import render_compose
-
 REPO_ROOT = Path(__file__).resolve().parents[2]
 
 COMPOSE_FILE = REPO_ROOT / "stacks/monitoring/compose/docker-compose.yml"
-ENV_EXAMPLE = REPO_ROOT / "stacks/monitoring/compose/.env.example"
-
-REQUIRED_SERVICES = {
-    "victoriametrics",
-    "vmagent",
-    "vmalert",
-    "alertmanager",
-    "grafana",
-    "node-exporter",
-    "cadvisor",
-    "victorialogs",
-}
 
-OPTIONAL_SERVICES = {}
+REQUIRED_SERVICES = frozenset(
+    {
+        # Metrics storage/query
+        "victoriametrics",
+        # Scrape/shipper
+        "vmagent",
+        # Alerting rules evaluation
+        "vmalert",
+        # Alertmanager for notifications
+        "alertmanager",
+        # Dashboards
+        "grafana",
+        # Exporters
+        "node-exporter",
+        "cadvisor",
+        # Logs storage/query (now required)
+        "victorialogs",
+    }
+)
+
+OPTIONAL_SERVICES: frozenset[str] = frozenset()
 
 # Policy: Prometheus runtime must not exist in the monitoring stack.
-BANNED_SERVICES = {"prometheus"}
+BANNED_SERVICES = frozenset({"prometheus"})
 
 
-def test_compose_renders():
+def test_compose_renders(rendered_compose: dict):
     assert COMPOSE_FILE.exists(), f"Missing {COMPOSE_FILE}"
-    data = render_compose(COMPOSE_FILE, env_file=ENV_EXAMPLE if ENV_EXAMPLE.exists() else None)
+    data = rendered_compose
     assert "services" in data and isinstance(data["services"], dict), "compose has no services"
 
 
-def test_required_services_present_and_banned_absent():
-    data = render_compose(COMPOSE_FILE, env_file=ENV_EXAMPLE if ENV_EXAMPLE.exists() else None)
-    services = set(data["services"].keys())
+def test_required_services_present_and_banned_absent(rendered_compose: dict):
+    services = set(rendered_compose["services"].keys())
 
     missing = sorted(REQUIRED_SERVICES - services)
     assert not missing, "Missing required monitoring services:\n" + "\n".join(missing)
@@ -52,13 +61,15 @@ def test_grafana_datasource_does_not_point_to_prometheus_runtime():
     if not prov_dir.exists():
         return
 
-    ymls = sorted(list(prov_dir.rglob("*.yml")) + list(prov_dir.rglob("*.yaml")))
+    # one tree walk for both extensions
+    ymls = sorted(p for p in prov_dir.rglob("*") if p.suffix in (".yml", ".yaml"))
     assert ymls, f"No datasource provisioning files found in {prov_dir}"
 
     bad = []
     for f in ymls:
-        txt = f.read_text(encoding="utf-8", errors="replace").lower()
-        if "http://prometheus" in txt or "https://prometheus" in txt or "prometheus:9090" in txt:
+        # bytes: ASCII needles, no decode pass needed
+        txt = f.read_bytes().lower()
+        if b"http://prometheus" in txt or b"https://prometheus" in txt or b"prometheus:9090" in txt:
             bad.append(f.relative_to(REPO_ROOT).as_posix())
 
     assert not bad, "Grafana datasources reference Prometheus runtime:\n" + "\n".join(bad)
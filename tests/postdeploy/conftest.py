@@ -2,18 +2,36 @@
 from __future__ import annotations
 
 import os
-import pathlib
 import time
-import urllib.error
-import urllib.request
+from collections.abc import Callable, Iterator, Mapping
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from tests._helpers import loads_json
+from tests._helpers import retry as _retry
 
+# Present only on the Pi; see _is_deploy_target().
+_DEPLOY_MARKER = "/etc/raspberry-pi-homelab/.env"
+
+# (url, headers) -> (monotonic ts, status, body, response headers); only 200s are memoized
+_HTTP_200_CACHE: dict[
+    tuple[str, tuple[tuple[str, str], ...]], tuple[float, int, str, Mapping[str, str]]
+] = {}
+
+
+@lru_cache(maxsize=1)
 def _is_deploy_target() -> bool:
-    # Heuristic: marker file exists on the Pi
-    return pathlib.Path("/etc/raspberry-pi-homelab/.env").exists()
+    """Forced via POSTDEPLOY_ON_TARGET=1, or detected once per session (one stat, not per test)."""
+    if os.environ.get("POSTDEPLOY_ON_TARGET") == "1":
+        return True
+    # Heuristic: marker file exists on the Pi (plain os.path, no Path object needed)
+    return os.path.isfile(_DEPLOY_MARKER)
 
 
 @pytest.fixture(autouse=True)
@@ -22,9 +40,6 @@ def _enforce_postdeploy_target(request: pytest.FixtureRequest) -> None:
     if request.node.get_closest_marker("postdeploy") is None:
         return
 
-    if os.environ.get("POSTDEPLOY_ON_TARGET") == "1":
-        return
-
     if _is_deploy_target():
         return
 
@@ -33,45 +48,113 @@ def _enforce_postdeploy_target(request: pytest.FixtureRequest) -> None:
     )
 
 
-@pytest.fixture
-def http_get():
-    """HTTP GET helper returning (status_code, body_text). Does not raise on HTTP status errors."""
-
-    def _get(url: str, headers: dict | None = None, timeout: int = 8) -> tuple[int, str]:
-        req = urllib.request.Request(url, headers=headers or {})
+@pytest.fixture(scope="session")
+def http() -> Iterator[requests.Session]:
+    """Pooled keep-alive session shared by all postdeploy HTTP probes.
+
+    Transient gateway errors (502/503/504) are retried twice with a short backoff; the final
+    response is returned rather than raised, so tests still assert on the status code.
+    Retry-After is left to the caller (see tests._helpers.RetryAfter): `retry` clamps that wait
+    to the test's deadline, urllib3 would sleep it unbounded inside a single GET.
+    """
+    retries = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    with requests.Session() as s:
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        yield s
+
+
+@pytest.fixture(scope="session")
+def http_get(http: requests.Session):
+    """HTTP GET helper returning (status_code, body_text). Does not raise on HTTP status errors.
+
+    Goes through the pooled `http` session: probes reuse keep-alive loopback connections.
+    200 responses are reused for POSTDEPLOY_HTTP_CACHE_TTL seconds (default 5, 0 disables) so
+    tests probing the same URL share one GET; pass cache=False to force a fresh GET. The
+    `retry` fixture drops the memo after each failed attempt. with_headers=True returns
+    (status_code, body_text, response_headers), e.g. to honour Retry-After on a 503.
+    """
+    ttl = float(os.environ.get("POSTDEPLOY_HTTP_CACHE_TTL", "5.0"))
+
+    def _get(
+        url: str,
+        headers: dict | None = None,
+        timeout: float = 8,
+        *,
+        cache: bool = True,
+        with_headers: bool = False,
+    ) -> tuple[int, str] | tuple[int, str, Mapping[str, str]]:
+        key = (url, tuple(sorted(headers.items())) if headers else ())
+        if cache and ttl > 0:
+            hit = _HTTP_200_CACHE.get(key)
+            if hit and time.monotonic() - hit[0] < ttl:
+                return hit[1:] if with_headers else hit[1:3]
         try:
-            with urllib.request.urlopen(req, timeout=timeout) as r:
-                return r.status, r.read().decode()
-        except urllib.error.HTTPError as e:
-            body = ""
-            try:
-                body = e.read().decode()
-            except Exception:
-                body = ""
-            return e.code, body
-        except urllib.error.URLError as e:
+            r = http.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
             raise AssertionError(f"network error for {url}: {e}") from e
+        # decode as UTF-8 like before (requests would guess latin-1 for charset-less text/plain)
+        body = r.content.decode(errors="replace")
+        if ttl > 0 and r.status_code == 200:  # cache=False still refreshes the memo
+            _HTTP_200_CACHE[key] = (time.monotonic(), r.status_code, body, r.headers)
+        if with_headers:
+            return r.status_code, body, r.headers
+        return r.status_code, body
 
     return _get
 
 
+@pytest.fixture(scope="session")
+def http_get_json(http: requests.Session):
+    """HTTP GET helper returning (status_code, payload) for JSON APIs.
+
+    A 200 body is parsed straight from the response bytes (no str round-trip, which matters
+    for larger answers like vmalert's /api/v1/rules); a 200 that isn't JSON raises
+    AssertionError so `retry` treats it as transient. For any other status, payload is the
+    body text, for diagnostics. Not memoized: every call is a fresh GET.
+    """
+
+    def _get_json(url: str, headers: dict | None = None, timeout: float = 8) -> tuple[int, Any]:
+        try:
+            r = http.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            raise AssertionError(f"network error for {url}: {e}") from e
+        if r.status_code != 200:
+            return r.status_code, r.content.decode(errors="replace")
+        try:
+            return r.status_code, loads_json(r.content)
+        except ValueError as e:
+            raise AssertionError(
+                f"GET {url}: 200 but body is not JSON ({e}). body[:400]={r.content[:400]!r}"
+            ) from e
+
+    return _get_json
+
+
 @pytest.fixture
 def retry():
-    """Retry helper for eventual consistency (scrapes, rule loads)."""
+    """Retry helper for eventual consistency (scrapes, rule loads); see tests._helpers.retry.
+
+    A failed attempt also drops memoized http_get responses, so a 200 whose body failed an
+    assertion is re-fetched instead of replayed until the TTL expires.
+    """
+
+    def _retry_fresh(assert_fn, *args, on_retry: Callable[[], None] | None = None, **kwargs):
+        def _invalidate() -> None:
+            _HTTP_200_CACHE.clear()
+            if on_retry is not None:
+                on_retry()
 
-    def _retry(assert_fn, timeout_s: int = 60, interval_s: float = 2.5) -> None:
-        deadline = time.time() + timeout_s
-        last_err: AssertionError | None = None
-        while time.time() < deadline:
-            try:
-                assert_fn()
-                return
-            except AssertionError as e:
-                last_err = e
-                time.sleep(interval_s)
-        raise last_err or AssertionError("retry timeout")
+        _retry(assert_fn, *args, on_retry=_invalidate, **kwargs)
 
-    return _retry
+    return _retry_fresh
 
 
 def _load_env_file_if_present(path: Path) -> None:
@@ -81,12 +164,14 @@ def _load_env_file_if_present(path: Path) -> None:
         text = path.read_text(encoding="utf-8")
     except PermissionError:
         return
-    for line in text.splitlines():
-        s = line.strip()
-        if not s or s.startswith("#") or "=" not in s:
+    # Parsed on every run on purpose: caching the result on disk would copy host-only
+    # secrets out of /etc into the checkout.
+    for s in map(str.strip, text.splitlines()):
+        if not s or s[0] == "#":
             continue
-        k, v = s.split("=", 1)
-        os.environ.setdefault(k.strip(), v.strip())
+        k, sep, v = s.partition("=")
+        if sep:
+            os.environ.setdefault(k.strip(), v.strip())
 
 
 # Host-only secrets/config (GitOps policy): load if present on the Pi
@@ -1,5 +1,6 @@
 import json
 import os
+import re
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -12,30 +13,44 @@ POSTDEPLOY_ON_TARGET = os.getenv("POSTDEPLOY_ON_TARGET") == "1"
 pytestmark = pytest.mark.postdeploy
 
 
-def _repo_root() -> Path:
-    # tests/postdeploy/<file> -> repo root is 3 levels up
-    return Path(__file__).resolve().parents[2]
+# tests/postdeploy/<file> -> repo root is 3 levels up
+REPO_DAEMON_JSON = Path(__file__).resolve().parents[2] / "stacks/core/docker/daemon.json"
+HOST_DAEMON_JSON = Path("/etc/docker/daemon.json")
+
+
+# Keep it robust across Docker/BuildKit versions: accept any known marker.
+_METRICS_MARKERS = (
+    "# HELP ",
+    "engine_daemon_engine_info",
+    "builder_builds_failed_total",
+)
+# one C-level scan per line for all markers (bytes: lines are matched undecoded)
+_METRICS_MARKER_RE = re.compile("|".join(map(re.escape, _METRICS_MARKERS)).encode())
 
 
 def _load_json(p: Path) -> dict:
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return json.loads(p.read_bytes())
     except FileNotFoundError as e:
         raise AssertionError(f"Missing file: {p}") from e
     except json.JSONDecodeError as e:
         raise AssertionError(f"Invalid JSON in {p}: {e}") from e
 
 
-def _required_keys_assertions(d: dict, *, where: str) -> None:
-    # Keep these tight and actionable. Adjust if you intentionally change daemon defaults.
-    required_top = {
+# Keep these tight and actionable. Adjust if you intentionally change daemon defaults.
+_REQUIRED_TOP = frozenset(
+    {
         "default-cgroupns-mode",
         "metrics-addr",
         "experimental",
         "log-driver",
         "log-opts",
     }
-    missing = sorted(k for k in required_top if k not in d)
+)
+
+
+def _required_keys_assertions(d: dict, *, where: str) -> None:
+    missing = sorted(_REQUIRED_TOP - d.keys())
     assert not missing, f"{where}: missing required top-level keys: {missing}"
 
     assert isinstance(d["log-opts"], dict), f"{where}: log-opts must be an object/dict"
@@ -65,17 +80,30 @@ def _metrics_url_from_metrics_addr(metrics_addr: str) -> str:
     return f"http://{host}:{port}/metrics"
 
 
-@pytest.mark.skipif(not POSTDEPLOY_ON_TARGET, reason="POSTDEPLOY_ON_TARGET=1 required")
-def test_docker_daemon_json_matches_repo_copy() -> None:
-    repo = _repo_root()
-    src = repo / "stacks/core/docker/daemon.json"
-    dst = Path("/etc/docker/daemon.json")
+@pytest.fixture(scope="module")
+def repo_daemon_json() -> dict:
+    """Repo copy of daemon.json, parsed once for all tests in this module."""
+    return _load_json(REPO_DAEMON_JSON)
 
-    src_json = _load_json(src)
-    dst_json = _load_json(dst)
+
+@pytest.fixture(scope="module")
+def host_daemon_json() -> dict:
+    """Host daemon.json, parsed once for all tests in this module. Treat as read-only."""
+    return _load_json(HOST_DAEMON_JSON)
+
+
+@pytest.mark.skipif(not POSTDEPLOY_ON_TARGET, reason="POSTDEPLOY_ON_TARGET=1 required")
+def test_docker_daemon_json_matches_repo_copy(
+    repo_daemon_json: dict, host_daemon_json: dict
+) -> None:
+    src, dst = REPO_DAEMON_JSON, HOST_DAEMON_JSON
+    src_json, dst_json = repo_daemon_json, host_daemon_json
 
     _required_keys_assertions(src_json, where=f"repo:{src}")
-    _required_keys_assertions(dst_json, where=f"host:{dst}")
+    # equal configs share the validated key set; only re-check the host copy when it differs,
+    # so a drifted host still gets the actionable missing-key message
+    if dst_json != src_json:
+        _required_keys_assertions(dst_json, where=f"host:{dst}")
 
     # Exact semantic equality (ignores key order / whitespace)
     assert dst_json == src_json, (
@@ -87,29 +115,34 @@ def test_docker_daemon_json_matches_repo_copy() -> None:
 
 
 @pytest.mark.skipif(not POSTDEPLOY_ON_TARGET, reason="POSTDEPLOY_ON_TARGET=1 required")
-def test_docker_metrics_endpoint_reachable_from_host() -> None:
-    dst = Path("/etc/docker/daemon.json")
-    cfg = _load_json(dst)
-    _required_keys_assertions(cfg, where=f"host:{dst}")
+def test_docker_metrics_endpoint_reachable_from_host(
+    http: requests.Session, host_daemon_json: dict
+) -> None:
+    dst = HOST_DAEMON_JSON
+    cfg = host_daemon_json
+    # full schema is covered by test_docker_daemon_json_matches_repo_copy; this probe needs one key
+    assert "metrics-addr" in cfg, f"host:{dst}: missing required top-level key: metrics-addr"
 
     url = _metrics_url_from_metrics_addr(str(cfg["metrics-addr"]))
 
+    # Stream the body and stop at the first marker: "# HELP" lines lead the exposition, so the
+    # rest of the (tens of KB) response is never read.
+    head = b""
+    found = False
     try:
-        r = requests.get(url, timeout=3)
+        with http.get(url, stream=True, timeout=(1, 3)) as r:  # (connect, read)
+            assert r.status_code == 200, f"Unexpected status from {url}: {r.status_code}"
+            for line in r.iter_lines(chunk_size=4096):
+                if len(head) < 200:
+                    head += line + b"\n"
+                if _METRICS_MARKER_RE.search(line):
+                    found = True
+                    break
     except requests.RequestException as e:
         raise AssertionError(f"Failed to reach Docker metrics endpoint: {url} ({e})") from e
 
-    assert r.status_code == 200, f"Unexpected status from {url}: {r.status_code}"
-    body = r.text
-
-    # Keep it robust across Docker/BuildKit versions: accept any known marker.
-    markers = (
-        "# HELP ",
-        "engine_daemon_engine_info",
-        "builder_builds_failed_total",
-    )
-    assert any(m in body for m in markers), (
+    assert found, (
         f"Metrics response from {url} does not look like Prometheus text format.\n"
-        f"Expected one of markers: {markers}\n"
-        f"First 200 chars:\n{body[:200]!r}"
+        f"Expected one of markers: {_METRICS_MARKERS}\n"
+        f"First 200 chars:\n{head[:200].decode(errors='replace')!r}"
     )
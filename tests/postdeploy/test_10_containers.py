@@ -2,21 +2,18 @@ from __future__ import annotations
 
 import os
 import time
-from pathlib import Path
 
 import pytest
 
 from tests._helpers import (
+    ComposePsError,
     compose_container_name,
-    compose_ps_json,
     compose_services_by_name,
-    find_monitoring_compose_file,
+    docker_inspect,
     run,
     which_ok,
 )
 
-COMPOSE_FILE: Path = find_monitoring_compose_file()
-
 # Tunables (env override)
 POSTDEPLOY_PS_TIMEOUT_S = int(os.environ.get("POSTDEPLOY_PS_TIMEOUT_S", "45"))
 POSTDEPLOY_PS_INTERVAL_S = float(os.environ.get("POSTDEPLOY_PS_INTERVAL_S", "1.0"))
@@ -26,6 +23,26 @@ POSTDEPLOY_HEALTH_INTERVAL_S = float(os.environ.get("POSTDEPLOY_HEALTH_INTERVAL_
 
 POSTDEPLOY_LOG_TAIL = int(os.environ.get("POSTDEPLOY_LOG_TAIL", "200"))
 
+# Expected compose state per service (substring of the ps State field).
+EXPECTED_STATES: dict[str, str] = {
+    "grafana": "running",
+    "alertmanager": "running",
+    "node-exporter": "running",
+    "cadvisor": "running",
+    "victoriametrics": "running",
+    "vmagent": "running",
+    "vmalert": "running",
+    # one-shot job:
+    "alertmanager-config-render": "exited",
+}
+# Long-running services: the ones that can restart or report a healthcheck.
+LONG_RUNNING_SERVICES: tuple[str, ...] = tuple(
+    svc for svc, state in EXPECTED_STATES.items() if state == "running"
+)
+
+# Prometheus is removed: treat it as permanently banned.
+BANNED_SERVICES: frozenset[str] = frozenset({"prometheus"})
+
 
 def _docker_logs_tail(container: str, tail: int = POSTDEPLOY_LOG_TAIL) -> str:
     if not which_ok("docker"):
@@ -41,28 +58,28 @@ def _now_ts() -> str:
 
 
 @pytest.mark.postdeploy
-def test_compose_services_state_json(retry):
-    expected = {
-        "grafana": "running",
-        "alertmanager": "running",
-        "node-exporter": "running",
-        "cadvisor": "running",
-        "victoriametrics": "running",
-        "vmagent": "running",
-        "vmalert": "running",
-        # one-shot job:
-        "alertmanager-config-render": "exited",
-    }
-
-    # Prometheus is removed: treat it as permanently banned.
-    banned: set[str] = {"prometheus"}
+@pytest.mark.requires_docker
+def test_compose_ps_succeeds(compose_ps):
+    # Session snapshot: the state tests below reuse it while fresh instead of forking ps again.
+    try:
+        compose_ps()
+    except ComposePsError as e:
+        pytest.fail(
+            f"`docker compose ps` failed for the monitoring stack (rc={e.returncode}):\n{e.stderr}"
+        )
+
+
+@pytest.mark.postdeploy
+@pytest.mark.requires_docker
+def test_compose_services_state_json(retry, compose_ps):
+    expected = EXPECTED_STATES
+    banned = BANNED_SERVICES
 
     rows: dict[str, dict] = {}
 
     def _wait_for_expected_services():
         nonlocal rows
-        ps_rows = compose_ps_json(compose_file=COMPOSE_FILE)
-        rows = compose_services_by_name(ps_rows)
+        rows = compose_services_by_name(compose_ps())
 
         present_banned = sorted(banned & set(rows.keys()))
         assert not present_banned, (
@@ -83,6 +100,7 @@ def test_compose_services_state_json(retry):
         _wait_for_expected_services,
         timeout_s=POSTDEPLOY_PS_TIMEOUT_S,
         interval_s=POSTDEPLOY_PS_INTERVAL_S,
+        on_retry=compose_ps.invalidate,
     )
 
     for svc, want in expected.items():
@@ -97,15 +115,13 @@ def test_compose_services_state_json(retry):
             exit_code = row.get("ExitCode")
 
             if exit_code is None:
-                if not which_ok("docker"):
-                    pytest.fail("docker required to inspect ExitCode for one-shot job")
-
                 name = compose_container_name(rows, svc) or ""
                 assert name, f"Missing container Name for service {svc}. Row: {row}"
 
-                insp = run(["docker", "inspect", "-f", "{{.State.ExitCode}}", name])
-                assert insp.returncode == 0, f"docker inspect failed:\n{insp.stdout}\n{insp.stderr}"
-                exit_code = (insp.stdout or "").strip()
+                try:
+                    exit_code = docker_inspect(name)["State"]["ExitCode"]
+                except RuntimeError as e:
+                    pytest.fail(f"cannot inspect ExitCode for one-shot job {svc}: {e}")
 
             assert str(exit_code) == "0", (
                 f"{svc}: expected ExitCode 0, got {exit_code}. Full row: {row}"
@@ -113,22 +129,13 @@ def test_compose_services_state_json(retry):
 
 
 @pytest.mark.postdeploy
-def test_compose_services_not_restarting_or_unhealthy(retry):
-    services = [
-        "grafana",
-        "alertmanager",
-        "node-exporter",
-        "cadvisor",
-        "victoriametrics",
-        "vmagent",
-        "vmalert",
-    ]
-
-    banned: set[str] = {"prometheus"}
+@pytest.mark.requires_docker
+def test_compose_services_not_restarting_or_unhealthy(retry, compose_ps):
+    services = LONG_RUNNING_SERVICES
+    banned = BANNED_SERVICES
 
     def _assert_services_ok():
-        ps_rows = compose_ps_json(compose_file=COMPOSE_FILE)
-        rows = compose_services_by_name(ps_rows)
+        rows = compose_services_by_name(compose_ps())
 
         present_banned = sorted(banned & set(rows.keys()))
         assert not present_banned, "Banned services present:\n" + "\n".join(present_banned)
@@ -136,11 +143,32 @@ def test_compose_services_not_restarting_or_unhealthy(retry):
         missing = sorted(set(services) - set(rows.keys()))
         assert not missing, "Missing services in compose ps:\n" + "\n".join(missing)
 
-        # Keep your existing checks here:
-        # - not restarting
-        # - not unhealthy
-        # (depends on how rows is structured)
+        # One ps snapshot per tick informs every service: no per-service poll loops.
+        unhealthy: list[str] = []
+        pending: list[str] = []
+        for svc in services:
+            row = rows[svc]
+            state = (row.get("State") or row.get("state") or "").lower()
+            health = (row.get("Health") or row.get("health") or "").lower()
+            if health == "unhealthy":
+                unhealthy.append(svc)
+            elif state == "restarting":
+                pending.append(f"{svc}: state=restarting")
+            elif health and health != "healthy":
+                pending.append(f"{svc}: health={health}")
+
+        if unhealthy:
+            # unhealthy is a verdict, not a transient: fail fast (pytest.fail bypasses retry)
+            logs = "\n\n".join(
+                f"--- {svc} logs ---\n{_docker_logs_tail(compose_container_name(rows, svc) or svc)}"
+                for svc in unhealthy
+            )
+            pytest.fail(f"Unhealthy services ({_now_ts()}): {unhealthy}\n\n{logs}")
+        assert not pending, f"Services not settled yet ({_now_ts()}):\n" + "\n".join(pending)
 
     retry(
-        _assert_services_ok, timeout_s=POSTDEPLOY_PS_TIMEOUT_S, interval_s=POSTDEPLOY_PS_INTERVAL_S
+        _assert_services_ok,
+        timeout_s=POSTDEPLOY_HEALTH_TIMEOUT_S,
+        interval_s=POSTDEPLOY_HEALTH_INTERVAL_S,
+        on_retry=compose_ps.invalidate,
     )
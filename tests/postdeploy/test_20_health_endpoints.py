@@ -1,16 +1,18 @@
-import json
 import subprocess
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 
 import pytest
 
-ALERTMANAGER_BASE = "http://127.0.0.1:9093"
-VICTORIAMETRICS_BASE = "http://127.0.0.1:8428"
-VMAGENT_BASE = "http://127.0.0.1:8429"
-VMALERT_BASE = "http://127.0.0.1:8880"
-GRAFANA_BASE = "http://127.0.0.1:3000"
-VLOGS_BASE = "http://127.0.0.1:9428"
+from tests._helpers import (
+    COLD_START_BACKOFF,
+    Fatal,
+    RetryAfter,
+    assert_http_200,
+    loads_json,
+    probe_all,
+)
+from tests._lib.endpoints import GRAFANA_BASE, READY_ENDPOINTS, VMAGENT_BASE
 
 # Container-internal endpoints (not exposed on host)
 NODE_EXPORTER_INNER = "http://127.0.0.1:9100"
@@ -47,8 +49,10 @@ def _looks_like_json(body: str) -> bool:
     return b.startswith("{") or b.startswith("[")
 
 
-def _assert_200(status: int, body: str, name: str, url: str) -> None:
-    assert status == 200, f"{name}: GET {url} expected 200, got {status}. body[:400]={body[:400]!r}"
+def _assert_200(
+    status: int, body: str, name: str, url: str, headers: Mapping[str, str] | None = None
+) -> None:
+    assert_http_200(status, body, url, name, headers=headers)
 
 
 def _assert_contains_any(body: str, needles: Iterable[str], name: str, url: str) -> None:
@@ -124,39 +128,77 @@ def _container_http_get(container: str, url: str, timeout: int = 6) -> tuple[int
 # -------------------------
 # Host-reachable endpoints
 # -------------------------
-@pytest.mark.postdeploy
-@pytest.mark.parametrize(
-    "check",
-    [
-        # Alertmanager
-        EndpointCheck("alertmanager-ready", f"{ALERTMANAGER_BASE}/-/ready"),
-        EndpointCheck("alertmanager-healthy", f"{ALERTMANAGER_BASE}/-/healthy"),
-        # VictoriaMetrics single-node
-        EndpointCheck("victoriametrics-ready", f"{VICTORIAMETRICS_BASE}/-/ready"),
-        EndpointCheck("victoriametrics-health", f"{VICTORIAMETRICS_BASE}/health"),
-        # vmagent
-        EndpointCheck("vmagent-ready", f"{VMAGENT_BASE}/-/ready"),
-        EndpointCheck("vmagent-health", f"{VMAGENT_BASE}/health"),
-        # vmalert
-        EndpointCheck("vmalert-ready", f"{VMALERT_BASE}/-/ready"),
-        EndpointCheck("vmalert-health", f"{VMALERT_BASE}/health"),
-        # VictoriaLogs:
-        EndpointCheck("victorialogs-insert-ready", f"{VLOGS_BASE}/insert/ready"),
-        EndpointCheck("victorialogs-metrics", f"{VLOGS_BASE}/metrics"),
-    ],
-    ids=lambda c: c.name,
+STRICT_READY_ENDPOINTS: tuple[EndpointCheck, ...] = tuple(
+    EndpointCheck(name, url) for name, url in READY_ENDPOINTS
 )
-def test_ready_health_endpoints_strict_200(retry, http_get, check: EndpointCheck):
-    """These endpoints must exist and return 200 when the service is healthy."""
 
-    def _check():
-        status, body = http_get(check.url, timeout=6)
-        _assert_200(status, body, check.name, check.url)
 
+def _endpoint_failure(
+    check: EndpointCheck, status: int, body: str, headers: Mapping[str, str]
+) -> AssertionError | None:
+    """None if the endpoint passed, else the assertion it failed (Fatal/RetryAfter preserved)."""
+    try:
+        _assert_200(status, body, check.name, check.url, headers)
         if check.name.endswith("-metrics"):
             _validate_metrics(body, check.name, check.url)
         else:
             _assert_contains_any(body, check.must_contain_any, check.name, check.url)
+    except AssertionError as e:
+        return e
+    return None
+
+
+@pytest.mark.postdeploy
+def test_ready_health_endpoints_strict_200(retry, http_get):
+    """
+    These endpoints must exist and return 200 when the service is healthy.
+
+    One aggregate test: every attempt probes all still-failing endpoints concurrently
+    (wall time ~ one round trip) and the failure lists each endpoint, not just the first.
+    """
+    pending: dict[str, EndpointCheck] = {c.url: c for c in STRICT_READY_ENDPOINTS}
+    failures: dict[str, str] = {}
+    fatal: dict[str, str] = {}  # 401/403/404/405: kept across attempts, never re-probed
+
+    def _get(url: str) -> tuple[int, str, Mapping[str, str]]:
+        return http_get(url, timeout=6, with_headers=True)
+
+    def _check():
+        results = probe_all(_get, pending)
+        failures.clear()
+        hints: list[float | None] = []  # Retry-After per transient failure (None: no hint)
+        for url, res in results.items():
+            check = pending[url]
+            if isinstance(res, Exception):  # e.g. http_get's "network error for <url>: <cause>"
+                cause = str(res).splitlines()[0] if str(res) else repr(res)
+                failures[check.name] = f"{check.name}: {cause}"
+                hints.append(None)
+                continue
+            err = _endpoint_failure(check, *res)
+            if err is None:
+                del pending[url]  # passed once: don't re-probe it on later attempts
+                continue
+            failure = str(err).splitlines()[0]
+            if isinstance(err, Fatal):
+                del pending[url]
+                fatal[check.name] = failure
+            else:
+                failures[check.name] = failure
+                hints.append(err.delay_s if isinstance(err, RetryAfter) else None)
+        failures.update(fatal)
+        if not failures:
+            return
+        msg = (
+            f"{len(failures)}/{len(STRICT_READY_ENDPOINTS)} ready/health endpoints failing:\n"
+            + "\n".join(f"  - {f}" for f in failures.values())
+        )
+        # Only stop early once nothing transient is left to wait for.
+        if len(fatal) == len(failures):
+            raise Fatal(msg)
+        # Wait for the soonest server hint, and only if every transient failure sent one.
+        if None not in hints:
+            raise RetryAfter(msg, min(hints))
+        raise AssertionError(msg)
 
     retry(_check, timeout_s=90, interval_s=3.0)
 
@@ -204,18 +246,17 @@ def test_container_internal_health_and_metrics_strict_200(retry, check: Containe
 
 
 @pytest.mark.postdeploy
-def test_grafana_health(retry, http_get):
+def test_grafana_health(retry, http_get_json):
     """Grafana health endpoint must return 200 and contain an expected marker."""
     url = f"{GRAFANA_BASE}/api/health"
 
     def _check():
-        status, body = http_get(url, timeout=6)
-        _assert_200(status, body, "grafana-health", url)
-        payload = json.loads(body)
+        status, payload = http_get_json(url, timeout=6)
+        _assert_200(status, str(payload), "grafana-health", url)
         assert isinstance(payload, dict), payload
         assert payload.get("database") in {"ok", "healthy"} or "version" in payload, payload
 
-    retry(_check, timeout_s=90, interval_s=3.0)
+    retry(_check, timeout_s=90, **COLD_START_BACKOFF)
 
 
 @pytest.mark.postdeploy
@@ -235,7 +276,7 @@ def test_vmagent_targets_endpoint_strict(retry, http_get):
         _assert_200(status, body, "vmagent-targets", url)
 
         if _looks_like_json(body):
-            payload = json.loads(body)
+            payload = loads_json(body)
             assert isinstance(payload, (dict, list)), payload
             if isinstance(payload, dict):
                 assert payload.get("status") in {"success", "ok"} or "data" in payload, payload
@@ -246,4 +287,4 @@ def test_vmagent_targets_endpoint_strict(retry, http_get):
                 f"targets response unexpected: body[:400]={body[:400]!r}"
             )
 
-    retry(_check, timeout_s=90, interval_s=3.0)
+    retry(_check, timeout_s=90, **COLD_START_BACKOFF)
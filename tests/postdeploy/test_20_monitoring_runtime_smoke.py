@@ -3,17 +3,24 @@ from __future__ import annotations
 import os
 
 import pytest
-import yaml
 
+from tests._helpers import safe_yaml_load
+from tests._lib.endpoints import (
+    ALERTMANAGER_BASE,
+    GRAFANA_BASE,
+    VICTORIAMETRICS_BASE,
+    VMAGENT_BASE,
+    VMALERT_BASE,
+)
 from tests._lib.http import get_json, wait_http_ok
 
 # Runtime smoke tests (Pi). Use IPv4 loopback for determinism.
 
-VM_URL = os.getenv("TEST_VM_URL", "http://127.0.0.1:8428")
-VMAGENT_URL = os.getenv("TEST_VMAGENT_URL", "http://127.0.0.1:8429")
-VMALERT_URL = os.getenv("TEST_VMALERT_URL", "http://127.0.0.1:8880")
-ALERTMANAGER_URL = os.getenv("TEST_ALERTMANAGER_URL", "http://127.0.0.1:9093")
-GRAFANA_URL = os.getenv("TEST_GRAFANA_URL", "http://127.0.0.1:3000")
+VM_URL = os.getenv("TEST_VM_URL", VICTORIAMETRICS_BASE)
+VMAGENT_URL = os.getenv("TEST_VMAGENT_URL", VMAGENT_BASE)
+VMALERT_URL = os.getenv("TEST_VMALERT_URL", VMALERT_BASE)
+ALERTMANAGER_URL = os.getenv("TEST_ALERTMANAGER_URL", ALERTMANAGER_BASE)
+GRAFANA_URL = os.getenv("TEST_GRAFANA_URL", GRAFANA_BASE)
 
 
 def _parse_alertmanager_original_yaml(status_payload: dict) -> dict:
@@ -34,7 +41,7 @@ def _parse_alertmanager_original_yaml(status_payload: dict) -> dict:
     )
 
     try:
-        parsed = yaml.safe_load(original)
+        parsed = safe_yaml_load(original)
     except Exception as e:
         snippet = original[:400].replace("\n", "\\n")
         raise AssertionError(
@@ -1,15 +1,14 @@
 # tests/postdeploy/test_21_victoriametrics_queries.py
 from __future__ import annotations
 
-import json
 import os
-import re
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
-VM_BASE = "http://127.0.0.1:8428"
-_METRIC_NAME_RE = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+from tests._helpers import assert_http_200
+from tests._lib.endpoints import VICTORIAMETRICS_BASE as VM_BASE
 
 
 def _env_list_or_default(var_name: str, default: list[str]) -> list[str]:
@@ -35,16 +34,41 @@ def _env_list_or_default(var_name: str, default: list[str]) -> list[str]:
     return [x.strip() for x in s.split(",") if x.strip()]
 
 
-def vm_query(http_get, expr: str) -> dict:
+def vm_query(http_get_json, expr: str) -> dict:
     qs = urllib.parse.urlencode({"query": expr})
     url = f"{VM_BASE}/api/v1/query?{qs}"
-    status, body = http_get(url, timeout=8)
-    assert status == 200, f"GET {url} expected 200, got {status}. body[:400]={body[:400]!r}"
-    payload = json.loads(body)
+    status, payload = http_get_json(url, timeout=8)
+    assert_http_200(status, str(payload), url)
+    # a non-object body (e.g. a proxy page that happens to be JSON) is retryable, not an error
+    assert isinstance(payload, dict), f"GET {url}: expected a JSON object, got {payload!r:.400}"
     assert payload.get("status") == "success", payload
     return payload
 
 
+def _vm_query_has_series(http_get_json, expr: str) -> tuple[bool, dict]:
+    """
+    Non-raising probe for retry loops: (True, payload) iff the instant query succeeded and
+    returned a non-empty vector (or a scalar, e.g. for "1"). On failure the dict is the
+    diagnostic (payload, or status/body for non-200 responses).
+    """
+    qs = urllib.parse.urlencode({"query": expr})
+    status, payload = http_get_json(f"{VM_BASE}/api/v1/query?{qs}", timeout=8)
+    if status != 200:
+        return False, {"expr": expr, "status": status, "body": payload[:400]}
+    if not isinstance(payload, dict):
+        return False, {"expr": expr, "status": status, "body": repr(payload)[:400]}
+    if payload.get("status") != "success":
+        return False, payload
+    data = payload.get("data") or {}
+    if not isinstance(data, dict):
+        return False, payload
+    result_type = data.get("resultType")
+    if result_type == "scalar":
+        return True, payload
+    result = data.get("result")
+    return result_type == "vector" and isinstance(result, list) and bool(result), payload
+
+
 def _result(payload: dict) -> tuple[str, list]:
     data = payload.get("data") or {}
     result_type = data.get("resultType")
@@ -63,8 +87,8 @@ def _metric_names_from_vector(result: list) -> set[str]:
     return names
 
 
-def _vm_jobs_present(http_get) -> set[str]:
-    payload = vm_query(http_get, "count by (job) (up)")
+def _vm_jobs_present(http_get_json) -> set[str]:
+    payload = vm_query(http_get_json, "count by (job) (up)")
     rt, result = _result(payload)
     assert rt == "vector", payload
     jobs = set()
@@ -87,17 +111,17 @@ def _hint_run_both_vm_expectation_tests() -> str:
 
 
 @pytest.mark.postdeploy
-def test_vm_query_api_responds_and_success(http_get):
-    payload = vm_query(http_get, "1")
+def test_vm_query_api_responds_and_success(http_get_json):
+    payload = vm_query(http_get_json, "1")
     result_type, result = _result(payload)
     assert result_type in {"vector", "scalar", "matrix"}, (result_type, payload)
     assert isinstance(result, list), payload
 
 
 @pytest.mark.postdeploy
-def test_vm_query_up_metric_exists(retry, http_get):
+def test_vm_query_up_metric_exists(retry, http_get_json):
     def _check():
-        payload = vm_query(http_get, "up")
+        payload = vm_query(http_get_json, "up")
         result_type, result = _result(payload)
         assert result_type == "vector", payload
         assert result, payload
@@ -109,7 +133,7 @@ def test_vm_query_up_metric_exists(retry, http_get):
 
 
 @pytest.mark.postdeploy
-def test_vm_expected_metrics_optional(retry, http_get):
+def test_vm_expected_metrics_optional(retry, http_get_json):
     expected = _env_list_or_default(
         "VM_EXPECT_METRICS",
         default=["up"],
@@ -129,34 +153,28 @@ def test_vm_expected_metrics_optional(retry, http_get):
     expected = [_normalize(x) for x in expected if _normalize(x)]
     assert expected, "VM_EXPECT_METRICS was set but empty after normalization"
 
-    def _check_one(expr_or_name: str) -> None:
-        # If it's a plain metric name, query by name; otherwise treat as PromQL expression.
-        expr = expr_or_name if not _METRIC_NAME_RE.match(expr_or_name) else expr_or_name
+    # Items are metric names or PromQL expressions; both are queried as-is.
+    def _probe(expr: str) -> tuple[str, bool, dict]:
+        return (expr, *_vm_query_has_series(http_get_json, expr))
 
-        payload = vm_query(http_get, expr)
-        result_type, result = _result(payload)
-
-        # Most instant queries yield vector; allow scalar for expressions like "1".
-        assert result_type in {"vector", "scalar"}, {"expr": expr, "payload": payload}
-
-        if result_type == "vector":
-            assert result, {"expr": expr, "payload": payload}
-
-    # Retry the whole set to allow scrape/ingestion to settle
+    # Retry the whole set to allow scrape/ingestion to settle. The queries are independent
+    # round trips: issue them concurrently so one attempt costs ~one RTT. Probes return bools
+    # (no raise/catch per item); only this check raises, once, listing every missing item.
     def _check_all():
-        missing = []
-        for item in expected:
-            try:
-                _check_one(item)
-            except AssertionError:
-                missing.append(item)
-        assert not missing, {"missing_or_empty": missing, "expected": expected}
+        with ThreadPoolExecutor(max_workers=min(8, len(expected))) as ex:
+            probes = list(ex.map(_probe, expected))
+        missing = {expr: diag for expr, ok, diag in probes if not ok}
+        assert not missing, {
+            "missing_or_empty": list(missing),
+            "expected": expected,
+            "diagnostics": missing,
+        }
 
     retry(_check_all, timeout_s=120, interval_s=3.0)
 
 
 @pytest.mark.postdeploy
-def test_vm_expected_jobs_optional(retry, http_get):
+def test_vm_expected_jobs_optional(retry, http_get_json):
     jobs = _env_list_or_default(
         "VM_EXPECT_JOBS",
         default=[
@@ -180,7 +198,7 @@ def test_vm_expected_jobs_optional(retry, http_get):
     required = sorted(set(jobs) - ignore)
 
     def _check():
-        present = _vm_jobs_present(http_get)
+        present = _vm_jobs_present(http_get_json)
         missing = sorted(set(required) - present)
         assert not missing, {
             "missing": missing,
@@ -3,6 +3,8 @@ import subprocess
 
 import pytest
 
+from tests._helpers import docker_inspect
+
 pytestmark = pytest.mark.postdeploy
 
 
@@ -56,8 +58,11 @@ def test_alertmanager_config_rendered_exists_on_host_and_in_container() -> None:
     host_path = os.path.join(host_dir, filename)
     container_path = os.path.join(container_dir, filename)
 
-    # 1) Container exists
-    _run(["docker", "inspect", container])
+    # 1) Container exists (one inspect also serves the mount check below)
+    try:
+        inspect = docker_inspect(container)
+    except RuntimeError as e:  # incl. NoSuchContainerError: a failure, not a test error
+        pytest.fail(f"cannot inspect Alertmanager container {container!r}: {e}")
 
     # 2) Host config exists + non-empty
     if not os.path.isfile(host_path):
@@ -73,14 +78,9 @@ def test_alertmanager_config_rendered_exists_on_host_and_in_container() -> None:
     _run(["docker", "exec", container, "sh", "-lc", f"grep -q '^receivers:' {container_path}"])
 
     # 5) Ensure bind mount is as expected (host_dir -> container_dir)
-    mounts = _run(
-        [
-            "docker",
-            "inspect",
-            container,
-            "--format",
-            '{{range .Mounts}}{{printf "%s -> %s (%s)\\n" .Source .Destination .Type}}{{end}}',
-        ]
+    mounts = "\n".join(
+        f"{m.get('Source')} -> {m.get('Destination')} ({m.get('Type')})"
+        for m in inspect.get("Mounts") or ()
     )
     expected = f"{host_dir} -> {container_dir} (bind)"
     if expected not in mounts.splitlines():
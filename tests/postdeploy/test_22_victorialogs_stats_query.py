@@ -51,12 +51,12 @@ def _wait_for_token_in_vlogs(base: str, token: str, timeout_s: float) -> None:
     """
     Poll VictoriaLogs until the token appears in _msg. Needed because ingestion can be async.
     """
-    deadline = time.time() + timeout_s
+    deadline = time.monotonic() + timeout_s
     last = ""
     q = f'_time:10m _msg:"{token}" | limit 5'
 
     interval = 0.5
-    while time.time() < deadline:
+    while time.monotonic() < deadline:
         try:
             last = _vlogs_query(base, q, timeout_s=min(5.0, timeout_s))
             if token in last:
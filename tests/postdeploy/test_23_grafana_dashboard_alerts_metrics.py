@@ -16,13 +16,14 @@ sudo -E bash -lc '
 from __future__ import annotations
 
 import base64
-import json
 import os
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from tests._helpers import loads_json
+
 
 def _grafana_base_url() -> str:
     return os.environ.get("GRAFANA_BASE_URL", "http://127.0.0.1:3000").strip().rstrip("/")
@@ -153,7 +154,7 @@ def test_grafana_dashboard_alerts_metrics_is_provisioned(http_get, retry) -> Non
             )
 
         try:
-            payload: Any = json.loads(body)
+            payload: Any = loads_json(body)
         except Exception as e:
             raise AssertionError(
                 f"Grafana returned non-JSON body: {e}\nurl={url}\nbody={body[:600]}"
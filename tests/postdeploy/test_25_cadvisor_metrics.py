@@ -1,16 +1,14 @@
 # tests/postdeploy/test_25_cadvisor_metrics.py
 import pytest
 
-from tests._helpers import run, which_ok
+from tests._helpers import run
 
 MONITORING_NETWORK = "monitoring"
 
 
 @pytest.mark.postdeploy
+@pytest.mark.requires_docker
 def test_cadvisor_metrics_endpoint_responds(retry):
-    if not which_ok("docker"):
-        pytest.skip("docker not available")
-
     cmd = [
         "docker",
         "run",
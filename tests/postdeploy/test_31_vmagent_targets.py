@@ -1,17 +1,15 @@
 # tests/postdeploy/test_31_vmagent_targets.py
 import pytest
 
-from tests._helpers import run, which_ok
+from tests._helpers import run
 
 MONITORING_NETWORK = "monitoring"
 VMAGENT_URL = "http://vmagent:8429/targets"
 
 
 @pytest.mark.postdeploy
+@pytest.mark.requires_docker
 def test_vmagent_targets_ui_reachable(retry):
-    if not which_ok("docker"):
-        pytest.skip("docker not available")
-
     cmd = [
         "docker",
         "run",
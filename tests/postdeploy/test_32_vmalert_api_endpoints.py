@@ -1,35 +1,34 @@
 # tests/postdeploy/test_32_vmalert_api.py
 from __future__ import annotations
 
-import json
-
 import pytest
 
-VMALERT_BASE = "http://127.0.0.1:8880"
+from tests._helpers import COLD_START_BACKOFF, assert_http_200
+from tests._lib.endpoints import VMALERT_BASE
 
 
-def _get_json(http_get, url: str) -> dict:
-    status, body = http_get(url, timeout=8)
-    assert status == 200, f"GET {url} expected 200, got {status}. body[:400]={body[:400]!r}"
-    return json.loads(body)
+def _get_json(http_get_json, url: str) -> dict:
+    status, payload = http_get_json(url, timeout=8)
+    assert_http_200(status, str(payload), url)
+    return payload
 
 
 @pytest.mark.postdeploy
-def test_vmalert_rules_endpoint_returns_groups(retry, http_get):
+def test_vmalert_rules_endpoint_returns_groups(retry, http_get_json):
     url = f"{VMALERT_BASE}/api/v1/rules"
 
     def _check():
-        j = _get_json(http_get, url)
+        j = _get_json(http_get_json, url)
         assert j.get("status") == "success", j
         groups = j.get("data", {}).get("groups", [])
         assert isinstance(groups, list), j
         assert groups, j  # strict by default (breaking change)
 
-    retry(_check, timeout_s=120, interval_s=3.0)
+    retry(_check, timeout_s=120, **COLD_START_BACKOFF)
 
 
 @pytest.mark.postdeploy
-def test_vmalert_alerts_endpoint_responds(http_get):
+def test_vmalert_alerts_endpoint_responds(http_get_json):
     url = f"{VMALERT_BASE}/api/v1/alerts"
-    j = _get_json(http_get, url)
+    j = _get_json(http_get_json, url)
     assert j.get("status") == "success", j
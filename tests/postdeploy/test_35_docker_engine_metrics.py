@@ -7,9 +7,9 @@ import urllib.parse
 
 import pytest
 
-from tests._helpers import run, which_ok
+from tests._helpers import assert_http_200, loads_json, run
+from tests._lib.endpoints import VICTORIAMETRICS_BASE as VM_BASE
 
-VM_BASE = "http://127.0.0.1:8428"
 DOCKER_ENGINE_PORT = 9323
 MONITORING_NETWORK = "monitoring"
 EXPECTED_BRIDGE_NAME = "br-monitoring"
@@ -48,9 +48,6 @@ def _assert_monitoring_ipam_is_stable(net: dict) -> tuple[str, str]:
 
 
 def _docker_network_inspect(name: str) -> dict:
-    if not which_ok("docker"):
-        pytest.skip("docker not available")
-
     res = run(["docker", "network", "inspect", name])
     if res.returncode != 0:
         pytest.fail(f"docker network inspect failed for {name}:\n{res.stdout}\n{res.stderr}")
@@ -94,11 +91,12 @@ def _vm_query(http_get, expr: str) -> dict:
     qs = urllib.parse.urlencode({"query": expr})
     url = f"{VM_BASE}/api/v1/query?{qs}"
     status, body = http_get(url, timeout=8)
-    assert status == 200, f"GET {url} expected 200, got {status}. body[:400]={body[:400]!r}"
-    return json.loads(body)
+    assert_http_200(status, body, url)
+    return loads_json(body)
 
 
 @pytest.mark.postdeploy
+@pytest.mark.requires_docker
 def test_docker_engine_metrics_network_and_ingestion_is_stable(retry, http_get):
     """
     Guardrails:
@@ -108,14 +108,14 @@ def _wait_for_token_in_vlogs(token: str, timeout_s: int) -> None:
     LogsQL idiom: `_time:<window> <filters> | limit N`
     We search in _msg using an exact phrase match to reduce false positives.
     """
-    deadline = time.time() + timeout_s
+    deadline = time.monotonic() + timeout_s
     last = ""
 
     # Keep LogsQL simple (avoid AND). Token has no spaces, so quoting is safe.
     q = f'_time:{VECTORE2E_QUERY_WINDOW} _msg:"{token}" | limit 5'
 
     interval = VECTORE2E_POLL_INTERVAL_S
-    while time.time() < deadline:
+    while time.monotonic() < deadline:
         try:
             last = _vlogs_query(q)
             if token in last:
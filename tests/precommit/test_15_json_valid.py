@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import codecs
 import json
 from pathlib import Path
 
@@ -27,7 +28,11 @@ def test_all_json_files_are_valid():
     errors: list[str] = []
     for f in json_files:
         try:
-            data = f.read_text(encoding="utf-8")
+            # bytes go straight to the parser (no separate decode pass). json.loads(bytes) would
+            # also accept a BOM or UTF-16/32, which read_text(encoding="utf-8") rejected: keep that.
+            data = f.read_bytes()
+            if data.startswith(codecs.BOM_UTF8) or b"\x00" in data:
+                raise ValueError("not plain UTF-8 (BOM or UTF-16/32)")
             json.loads(data)
         except Exception as e:
             rel = f.relative_to(REPO_ROOT)
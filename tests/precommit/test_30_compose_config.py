@@ -6,7 +6,7 @@ from pathlib import Path
 
 import pytest
 
-from tests._helpers import find_monitoring_compose_file, run, which_ok
+from tests._helpers import run, which_ok
 
 
 def compose_cmd() -> list[str] | None:
@@ -88,8 +88,7 @@ def strip_env_file_blocks(compose_text: str) -> tuple[str, list[int]]:
 
 
 @pytest.mark.precommit
-def test_compose_config(tmp_path: Path):
-    compose_file = find_monitoring_compose_file()
+def test_compose_config(tmp_path: Path, compose_file: Path):
     if not compose_file.exists():
         pytest.fail(f"Compose file missing: {compose_file}")
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+from types import ModuleType
+
+import pytest
+
+from tests._helpers import REPO_ROOT
+
+SCRIPT = REPO_ROOT / "scripts" / "grafana" / "normalize_dashboards.py"
+
+# floats with several valid spellings, ints beyond 64 bits, NaN and non-ASCII
+_NUMERIC_DASHBOARD = (
+    b'{"uid": "old", "title": "10\xe2\x80\x9330m",'
+    b' "panels": [{"gridPos": {"x": 0.00001, "y": 1e16, "w": 0.1},'
+    b' "big": 123456789012345678901234567890, "neg": -9223372036854775809,'
+    b' "nan": NaN, "datasource": "Prometheus"}]}'
+)
+
+
+@pytest.fixture(scope="module")
+def nd() -> ModuleType:
+    """The script is not a package module: load it from its path."""
+    spec = importlib.util.spec_from_file_location("normalize_dashboards", SCRIPT)
+    assert spec and spec.loader
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    mod.init_uid_links({})
+    return mod
+
+
+def _normalize(nd: ModuleType, raw: bytes) -> tuple[bytes, bool]:
+    out, bad = nd.normalize_one(raw, "x/dash.json", "x-dash")
+    return (raw if out is None else out), bad
+
+
+@pytest.mark.precommit
+def test_output_keeps_stdlib_number_and_unicode_spelling(nd):
+    out = _normalize(nd, _NUMERIC_DASHBOARD)[0].decode()
+
+    assert '"x": 1e-05' in out and '"y": 1e+16' in out, out
+    assert "123456789012345678901234567890" in out and "-9223372036854775809" in out, out
+    assert '"title": "10\\u201330m"' in out, out  # escaped, as committed dashboards are
+
+
+@pytest.mark.precommit
+def test_read_dashboard_probes_uid(nd, tmp_path):
+    f = tmp_path / "d.json"
+    f.write_bytes(_NUMERIC_DASHBOARD)
+    assert nd.read_dashboard(f) == (_NUMERIC_DASHBOARD, "old")
+
+
+@pytest.mark.precommit
+def test_normalize_is_idempotent_on_stdlib_output(nd):
+    out, _ = _normalize(nd, _NUMERIC_DASHBOARD)
+    assert nd.normalize_one(out, "x/dash.json", "x-dash") == (None, False)
+    assert json.loads(out)["uid"] == "x-dash"
+
+
+@pytest.mark.precommit
+def test_iter_json_files_does_not_follow_symlinked_dirs(nd, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.json").write_text("{}")
+    (tmp_path / "sub" / "loop").symlink_to(tmp_path, target_is_directory=True)
+    (tmp_path / "manifest.json").write_text("{}")
+
+    found = sorted(p.relative_to(tmp_path).as_posix() for p in nd.iter_json_files(tmp_path))
+    assert found == ["sub/a.json"]
+
+
+@pytest.mark.precommit
+def test_leftover_ds_prometheus_placeholder_is_reported(nd, tmp_path, monkeypatch, capsys):
+    root = tmp_path / "stacks" / "monitoring" / "grafana" / "dashboards"
+    root.mkdir(parents=True)
+    # a uid outside a "datasource" value is not normalized, so the placeholder survives
+    (root / "dash.json").write_text(
+        json.dumps({"uid": "d", "templating": {"list": [{"uid": "${DS_PROMETHEUS}"}]}})
+    )
+    (root / "clean.json").write_text(json.dumps({"uid": "c", "panels": []}))
+    monkeypatch.chdir(tmp_path)
+    # serial path: workers can't unpickle functions of a module loaded from a file path
+    monkeypatch.setattr(nd.os, "cpu_count", lambda: 1)
+
+    assert nd.main() == 0
+    out = capsys.readouterr().out
+    assert "WARN: unresolved datasource uid ${DS_PROMETHEUS} left in: dash.json" in out, out
+    assert "clean.json" not in out, out